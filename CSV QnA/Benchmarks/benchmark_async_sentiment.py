@@ -0,0 +1,115 @@
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # "CSV QnA", for survey_common
+import survey_common
+survey_common.add_script_dirs(survey_common.SENTIMENT_COLLECTOR)
+import requests
+import async_sentiment_client
+# python version 3.11
+
+# Serial requests.post loop vs AsyncSentimentClient against a local stub of the sentiment API.
+# The stub labels odd-numbered responses negative, so every async label is checked against its
+# own text; with --short-every N every Nth batch response drops a result, and those batches
+# must come back as failed rows (None) rather than shifted onto other texts.
+
+
+class StubSentimentHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    disable_nagle_algorithm = True
+    latency = 0.05
+    short_every = 0
+    batches = 0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.latency)  # simulated model + network time
+        if "texts" in body:
+            results = [{"sentiment": {"sentiment": stub_label(text)}} for text in body["texts"]]
+            StubSentimentHandler.batches += 1
+            if self.short_every and StubSentimentHandler.batches % self.short_every == 0:
+                results = results[1:]
+            payload = {"sentiments": results}
+        else:
+            payload = {"sentiment": {"sentiment": stub_label(body["text"])}}
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def stub_label(text):
+    return "negative" if int(text.rsplit(" ", 1)[-1]) % 2 else "positive"
+
+
+def start_stub_server(latency, short_every=0):
+    StubSentimentHandler.latency = latency
+    StubSentimentHandler.short_every = short_every
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubSentimentHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/v1/ai/sentiment"
+
+
+def run_serial(url, texts, rate_per_sec):
+    # The old get_sentiments loop: one blocking request per row, paced to the same rate limit
+    labels = []
+    interval = 1 / rate_per_sec
+    with requests.Session() as session:
+        for text in texts:
+            start = time.perf_counter()
+            response = session.post(url, json={"text": text}, timeout=30).json()
+            labels.append(async_sentiment_client.parse_sentiment(response))
+            time.sleep(max(0.0, interval - (time.perf_counter() - start)))
+    return labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the async sentiment client against a local stub server.")
+    parser.add_argument("--rows", type=int, default=2_000)
+    parser.add_argument("--serial-rows", type=int, default=100, help="serial timing is extrapolated from this many rows")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--rate", type=float, default=500, help="requests per second allowed by the provider")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=1, help="texts per request (sent as a \"texts\" list)")
+    parser.add_argument("--short-every", type=int, default=0, help="drop one result from every Nth batch response")
+    args = parser.parse_args()
+
+    server, url = start_stub_server(args.latency, args.short_every)
+    texts = [f"response number {i}" for i in range(args.rows)]
+    try:
+        start = time.perf_counter()
+        run_serial(url, texts[:args.serial_rows], args.rate)
+        serial_rps = args.serial_rows / (time.perf_counter() - start)
+
+        client = async_sentiment_client.AsyncSentimentClient(
+            url=url, rate_per_sec=args.rate, burst=args.concurrency, max_concurrency=args.concurrency,
+            batch_size=args.batch_size, batch_field="texts" if args.batch_size > 1 else None)
+        start = time.perf_counter()
+        labels = client.classify(texts)
+        async_rps = len(labels) / (time.perf_counter() - start)
+    finally:
+        server.shutdown()
+
+    assert len(labels) == len(texts)
+    failed = labels.count(async_sentiment_client.FAILED)
+    assert all(label in (stub_label(text), async_sentiment_client.FAILED) for text, label in zip(texts, labels)), \
+        "labels shifted between texts"
+    assert failed == client.failures, f"{failed} unlabelled rows, {client.failures} failures counted"
+
+    print(f"serial: {serial_rps:8.1f} rows/sec")
+    print(f"async:  {async_rps:8.1f} rows/sec  {client.stats()}")
+    print(f"speedup: {async_rps / serial_rps:.1f}x at {args.rate:g} requests/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # "CSV QnA", for survey_common
+import survey_common
+survey_common.add_script_dirs(survey_common.TOP_K_PHRASES_COLLECTOR)
+
+import numpy as np
+import top_k_clusters as tkc
+
+
+WORDS = [f"word{i}" for i in range(2000)]
+
+
+def make_documents(n_docs, seed=42):
+    rng = random.Random(seed)
+    documents = []
+    for _ in range(n_docs):
+        length = rng.randint(5, 20)
+        # Zipf-like skew so that some phrases are common and most are rare, like real answers
+        documents.append(" ".join(WORDS[min(int(rng.paretovariate(1.2)) - 1, len(WORDS) - 1)] for _ in range(length)))
+    return documents
+
+
+def legacy_calc_percentages(total_respondents, bow_matrix, feature_names):
+    # The original per-column implementation, kept here only for comparison
+    phrase_freq_pairs = {}
+    for i, phrase in enumerate(feature_names):
+        phrase_freq = (bow_matrix[:, i] > 0).sum()
+        phrase_freq_pairs[phrase] = phrase_freq
+    phrase_percentage_pairs = []
+    for phrase, count in phrase_freq_pairs.items():
+        percentage = (count / total_respondents) * 100
+        phrase_percentage_pairs.append((phrase, percentage))
+    return phrase_percentage_pairs
+
+
+def legacy_get_top_K(K, results):
+    results.sort(key=lambda x: x[1], reverse=True)
+    return results[:K]
+
+
+def time_legacy(n_docs, bow_matrix, feature_names, K, max_features):
+    # Slicing every column of a large CSR matrix takes hours, so time a prefix of the
+    # vocabulary and extrapolate linearly when the vocabulary is bigger than max_features
+    n_timed = min(len(feature_names), max_features)
+    start = time.perf_counter()
+    pairs = legacy_calc_percentages(n_docs, bow_matrix[:, :n_timed], feature_names[:n_timed])
+    elapsed = (time.perf_counter() - start) * len(feature_names) / n_timed
+    start = time.perf_counter()
+    legacy_get_top_K(K, pairs)
+    elapsed += time.perf_counter() - start
+    return elapsed, n_timed < len(feature_names)
+
+
+def time_new(n_docs, bow_matrix, feature_names, K):
+    start = time.perf_counter()
+    pairs = tkc.calc_percentages(n_docs, bow_matrix, feature_names)
+    top_k = tkc.get_top_K(K, pairs)
+    return time.perf_counter() - start, top_k
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the per-column and sparse document-frequency paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--K", type=int, default=5)
+    parser.add_argument("--legacy-max-features", type=int, default=2_000)
+    args = parser.parse_args()
+
+    print(f"{'docs':>10} {'features':>10} {'legacy (s)':>12} {'sparse (s)':>12} {'speedup':>10}")
+    for n_docs in args.sizes:
+        documents = make_documents(n_docs)
+        bow_matrix, feature_names = tkc.do_bow(documents, 1, 3)
+
+        legacy_seconds, estimated = time_legacy(n_docs, bow_matrix, feature_names, args.K, args.legacy_max_features)
+        new_seconds, top_k = time_new(n_docs, bow_matrix, feature_names, args.K)
+
+        # Sanity check: both paths agree on the full ranking
+        expected = legacy_get_top_K(args.K, legacy_calc_percentages(n_docs, bow_matrix[:, :200], feature_names[:200]))
+        got = tkc.get_top_K(args.K, tkc.calc_percentages(n_docs, bow_matrix[:, :200], feature_names[:200]))
+        assert [p for p, _ in expected] == [p for p, _ in got]
+        assert np.allclose([v for _, v in expected], [v for _, v in got])
+
+        legacy_label = f"{legacy_seconds:.2f}{'*' if estimated else ''}"
+        print(f"{n_docs:>10} {len(feature_names):>10} {legacy_label:>12} {new_seconds:>12.4f} {legacy_seconds / new_seconds:>9.0f}x")
+    print("* legacy time extrapolated from the first --legacy-max-features columns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import argparse
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # "CSV QnA", for survey_common
+from survey_common import encoding_sniffer
+# python version 3.11
+
+# Passes over the input for the old try-each-encoding loops vs the encoding sniffer,
+# on UTF-8 exports with cp1252 bytes (smart quotes, e-acute) in the last rows.
+
+CONCATENATOR_ENCODINGS = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1', 'utf-8-sig']
+TOP_K_ENCODINGS = ['utf-8', 'utf-8-sig', 'latin-1', 'cp1252', 'iso-8859-1']
+
+
+class CountingReader(io.RawIOBase):
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        size = self.raw.readinto(target)
+        self.bytes_read += size
+        return size
+
+    def close(self):
+        self.raw.close()
+        super().close()
+
+
+def make_mixed_file(path, rows, bad_rows):
+    with open(path, 'wb') as f:
+        f.write("ID,Answer\r\n".encode('utf-8'))
+        for i in range(rows):
+            answer = f"Row {i}: the café workshop was “great”"
+            # the last bad_rows rows were pasted in from a cp1252 spreadsheet
+            f.write(f'{i},"{answer}"\r\n'.encode('cp1252' if i >= rows - bad_rows else 'utf-8'))
+
+
+def old_loop(path, encodings):
+    bytes_read = 0
+    for encoding in encodings:
+        counter = CountingReader(open(path, 'rb'))
+        try:
+            with io.TextIOWrapper(io.BufferedReader(counter), encoding=encoding, newline='') as text:
+                rows = sum(1 for _ in csv.reader(text))
+            return rows, bytes_read + counter.bytes_read
+        except UnicodeDecodeError:
+            bytes_read += counter.bytes_read
+    raise ValueError("no encoding worked")
+
+
+def sniffer(path):
+    encoding = encoding_sniffer.detect_file_encoding(path)
+    bytes_read = min(os.path.getsize(path), encoding_sniffer.SAMPLE_BYTES)  # the sample
+    counter = CountingReader(open(path, 'rb'))
+    with io.TextIOWrapper(io.BufferedReader(counter), encoding=encoding,
+                          errors=encoding_sniffer.FALLBACK_ERRORS, newline='') as text:
+        rows = sum(1 for _ in csv.reader(text))
+    return rows, bytes_read + counter.bytes_read
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare passes over a mixed-encoding file.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--bad-rows", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'MB':>8} {'method':>24} {'passes':>7} {'seconds':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            path = os.path.join(tmp, f"mixed_{rows}.csv")
+            make_mixed_file(path, rows, args.bad_rows)
+            size = os.path.getsize(path)
+            methods = [
+                ("concatenator loop", lambda: old_loop(path, CONCATENATOR_ENCODINGS)),
+                ("top_k_phrases_main loop", lambda: old_loop(path, TOP_K_ENCODINGS)),
+                ("encoding_sniffer", lambda: sniffer(path)),
+            ]
+            for name, method in methods:
+                start = time.perf_counter()
+                counted_rows, bytes_read = method()
+                seconds = time.perf_counter() - start
+                assert counted_rows == rows + 1
+                print(f"{rows:>10} {size / 1e6:>8.1f} {name:>24} {bytes_read / size:>7.2f} {seconds:>8.2f}")
+    print(f"fallback decodes: {encoding_sniffer.fallback_stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import argparse
+import datetime
+import importlib
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+import synthetic_survey
+from run_benchmarks import CSV_QNA, git_revision
+from survey_common import handler_client
+# python version 3.11
+
+# Per-request latency of the handlers three ways, on one synthetic survey:
+#   cold_ms     a fresh interpreter per call, as the entry points run today (imports included)
+#   daemon_ms   the same call through a warm handler_daemon via handler_client
+#   compute_ms  the handler called in this process after a warm-up call
+#   daemon_compute_ms  mean time inside the handler in the daemon's worker (from /health)
+# daemon_ms - daemon_compute_ms is what the daemon adds (JSON both ways plus a localhost round trip).
+# make_sentiment_column2 is left out: it needs the transformers model, whose load is the
+# per-process cost the daemon's workers pay once at start-up.
+
+HANDLERS = ("calculate_percentage", "top_k_clusters2", "top_k_formatter")
+
+COLD_CALL = (
+    "import importlib, json, sys, survey_common; "
+    "survey_common.add_script_dirs(*survey_common.COLLECTORS); "
+    "args = json.load(open(sys.argv[2], encoding='utf-8')); "
+    "importlib.import_module(sys.argv[1]).handler(*args)"
+)
+
+
+def make_requests(csv_path):
+    # handler name -> positional arguments, as the entry points pass them
+    import pandas as pd
+    from survey_common import encoding_sniffer
+    from survey_common import sfs_codec
+    import top_k_clusters2
+    with encoding_sniffer.open_text(csv_path) as csv_file:
+        df = pd.read_csv(csv_file)
+    # the TF-IDF handler rejects blank answers (and "N/A", read back as NaN), so keep answered rows
+    df = df[df.iloc[:, 1].notna()].reset_index(drop=True)
+    df["sentiment"] = [("positive", "neutral", "negative")[row % 3] for row in range(len(df))]
+    envelope = sfs_codec.df_to_sfs(df, os.path.basename(csv_path))
+    top_k_input = {"File": envelope, "K": 5}
+    return {
+        "calculate_percentage": [envelope],
+        "top_k_clusters2": [top_k_input],
+        "top_k_formatter": [top_k_clusters2.handler(top_k_input)],
+    }
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def start_daemon(workers):
+    port = free_port()
+    start = time.perf_counter()
+    daemon = subprocess.Popen(
+        [sys.executable, str(CSV_QNA / "handler_daemon.py"), "--port", str(port), "--workers", str(workers),
+         "--no-preload-model"],
+        stdout=subprocess.PIPE, text=True,
+    )
+    daemon.stdout.readline()  # printed once every worker is warm and the socket is bound
+    return daemon, f"http://127.0.0.1:{port}", time.perf_counter() - start
+
+
+def daemon_compute_seconds(url):
+    with urllib.request.urlopen(f"{url}/health") as response:
+        return json.loads(response.read())["compute_seconds"]
+
+
+def time_calls(call, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+    return round(statistics.median(timings) * 1000, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-request handler latency with and without handler_daemon.")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    args = parser.parse_args()
+
+    report = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "rows": args.rows,
+        "runs": [],
+    }
+    with tempfile.TemporaryDirectory() as work_dir:
+        csv_path = os.path.join(work_dir, "survey.csv")
+        synthetic_survey.generate_survey(csv_path, args.rows, seed=args.seed)
+        requests = make_requests(csv_path)
+        daemon, url, report["daemon_startup_seconds"] = start_daemon(args.workers)
+        try:
+            for name in HANDLERS:
+                handler = importlib.import_module(name).handler
+                handler_args = requests[name]
+                args_path = os.path.join(work_dir, f"{name}.json")
+                with open(args_path, "w", encoding="utf-8") as args_file:
+                    json.dump(handler_args, args_file, default=handler_client.json_default)
+                handler(*handler_args)  # warm-up: lazy imports, first-call allocations
+                result = {
+                    "handler": name,
+                    "cold_ms": time_calls(lambda: subprocess.run([sys.executable, "-c", COLD_CALL, name, args_path],
+                                                                 cwd=CSV_QNA, check=True), args.repeats),
+                    "compute_ms": time_calls(lambda: handler(*handler_args), args.repeats),
+                }
+                handler_client.call(url, name, handler_args)  # warm-up in the worker too
+                compute_before = daemon_compute_seconds(url)
+                result["daemon_ms"] = time_calls(lambda: handler_client.call(url, name, handler_args), args.repeats)
+                result["daemon_compute_ms"] = round((daemon_compute_seconds(url) - compute_before) / args.repeats * 1000, 2)
+                result["daemon_overhead_ms"] = round(result["daemon_ms"] - result["daemon_compute_ms"], 2)
+                report["runs"].append(result)
+                print(f"{name:>22}: cold {result['cold_ms']} ms, daemon {result['daemon_ms']} ms "
+                      f"(overhead {result['daemon_overhead_ms']} ms), in-process {result['compute_ms']} ms", file=sys.stderr)
+        finally:
+            daemon.terminate()
+            daemon.wait()
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
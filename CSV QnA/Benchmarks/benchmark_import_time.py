@@ -0,0 +1,123 @@
+import argparse
+import datetime
+import json
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from run_benchmarks import CSV_QNA, git_revision
+# python version 3.11
+
+# Cold-start cost of each entry point: what a process pays before any real work starts.
+# For every entry point, in fresh interpreters:
+#   import_ms   cumulative "python -X importtime" time of the entry module itself
+#   packages_ms first-import time of the heavy libraries it pulled in (pandas, sklearn, ...)
+#   help_ms     wall time of "python <entry point> --help", interpreter start-up included
+# Medians over --repeats runs; the OS file cache is warm after the first run, so the
+# numbers track import work rather than disk reads.
+
+# module -> (directory it runs from, has a command line)
+ENTRY_POINTS = {
+    "sentiment_counter_main": ("Sentiment_Collector", True),
+    "calculate_percentage": ("Sentiment_Collector", False),
+    "top_k_phrases_main": ("Top_K_Phrases_Collector", True),
+    "phrase_index": ("Top_K_Phrases_Collector", True),
+    "survey_pipeline": (".", True),
+}
+HEAVY_PACKAGES = ("pandas", "numpy", "scipy", "sklearn", "pyarrow", "transformers", "torch", "chardet")
+
+# "import time:  <self us> | <cumulative us> | <two spaces per nesting level><module>"
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+def import_profile(module, cwd):
+    # One interpreter: importtime lines on stderr, the heavy packages left loaded on stdout.
+    # The module is imported from its own folder, the way handler modules are loaded
+    script = (f"import {module}, sys; "
+              f"print(' '.join(name for name in {HEAVY_PACKAGES!r} if name in sys.modules))")
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", script],
+                               cwd=cwd, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+    import_us = None
+    packages_us = {}
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative_us, name = int(match.group(2)), match.group(4)
+        if name == module:
+            import_us = cumulative_us
+        elif name in HEAVY_PACKAGES:
+            packages_us[name] = cumulative_us
+    return import_us, packages_us, completed.stdout.split()
+
+
+def help_seconds(module, cwd):
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, f"{module}.py", "--help"], cwd=cwd, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+    return time.perf_counter() - start
+
+
+def interpreter_seconds():
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return time.perf_counter() - start
+
+
+def median_ms(values):
+    return round(statistics.median(values) * 1000, 1)
+
+
+def profile_entry_point(module, repeats):
+    directory, has_cli = ENTRY_POINTS[module]
+    cwd = CSV_QNA / directory
+    result = {"entry_point": module}
+    try:
+        profiles = [import_profile(module, cwd) for _ in range(repeats)]
+        result["import_ms"] = median_ms([import_us / 1e6 for import_us, _, _ in profiles])
+        result["heavy_packages_loaded"] = profiles[-1][2]
+        result["packages_ms"] = {name: median_ms([packages_us.get(name, 0) / 1e6 for _, packages_us, _ in profiles])
+                                 for name in profiles[-1][1]}
+        if has_cli:
+            result["help_ms"] = median_ms([help_seconds(module, cwd) for _ in range(repeats)])
+    except RuntimeError as e:
+        result["error"] = str(e)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the cold-start import time of each entry point and emit JSON.")
+    parser.add_argument("--entry-points", nargs="+", choices=sorted(ENTRY_POINTS), default=list(ENTRY_POINTS))
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    args = parser.parse_args()
+
+    report = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "interpreter_ms": median_ms([interpreter_seconds() for _ in range(args.repeats)]),
+        "runs": [],
+    }
+    for module in args.entry_points:
+        result = profile_entry_point(module, args.repeats)
+        report["runs"].append(result)
+        print(f"{module:>24}: import {result.get('import_ms', result.get('error'))} ms, "
+              f"--help {result.get('help_ms', '-')} ms", file=sys.stderr)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
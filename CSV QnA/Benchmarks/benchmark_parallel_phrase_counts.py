@@ -0,0 +1,42 @@
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # "CSV QnA", for survey_common
+import survey_common
+survey_common.add_script_dirs(survey_common.TOP_K_PHRASES_COLLECTOR)
+
+import top_k_clusters as tkc
+import parallel_phrase_counts
+from benchmark_calc_percentages import make_documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling of the process-pool phrase counts against serial do_bow.")
+    parser.add_argument("--docs", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--K", type=int, default=5)
+    args = parser.parse_args()
+
+    documents = make_documents(args.docs)
+    start = time.perf_counter()
+    bow_matrix, feature_names = tkc.do_bow(documents, 1, 3)
+    expected = tkc.get_top_K(args.K, tkc.calc_percentages(len(documents), bow_matrix, feature_names))
+    serial_seconds = time.perf_counter() - start
+    print(f"{args.docs} docs, {os.cpu_count()} CPUs; serial do_bow + calc_percentages: {serial_seconds:.2f}s")
+
+    print(f"{'workers':>8} {'seconds':>9} {'vs serial':>10} {'vs 1 worker':>12} {'identical':>10}")
+    one_worker_seconds = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        pairs = parallel_phrase_counts.phrase_percentages(documents, workers)
+        top_k = tkc.get_top_K(args.K, pairs)
+        seconds = time.perf_counter() - start
+        one_worker_seconds = one_worker_seconds or seconds
+        print(f"{workers:>8} {seconds:>9.2f} {serial_seconds / seconds:>9.2f}x {one_worker_seconds / seconds:>11.2f}x "
+              f"{str(top_k == expected):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+import numpy as np
+from PIL import Image, ImageOps
+sys.path.append(str(Path(__file__).resolve().parents[2]))  # repository root, for QR_maker
+import QR_maker
+
+# Micro-benchmark of the two QR renderers in QR_maker, plus a check that the codes still read back:
+#   module check  samples the centre of every module in the rendered image against the QR matrix
+#   decode check  decodes the image with OpenCV's QRCodeDetector (or pyzbar) when one is installed
+
+URLS = ["ip-tribe.com", "google.com", "https://example.com/staff/jane-doe?ref=card", "ip-tribe.com/" + "x" * 120]
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def sample_modules(image, modules, renderer):
+    # Read each module back from the pixel at its centre (renders are centred in QR_SIZE)
+    alpha = np.asarray(image)[:, :, 3] > 127
+    scale_y, scale_x = image.height / modules, image.width / modules
+    if renderer == "matrix":
+        scale_x = scale_y = min(image.width // modules, image.height // modules)
+    top = (image.height - scale_y * modules) / 2
+    left = (image.width - scale_x * modules) / 2
+    centres_y = (top + (np.arange(modules) + 0.5) * scale_y).astype(int)
+    centres_x = (left + (np.arange(modules) + 0.5) * scale_x).astype(int)
+    return alpha[np.ix_(centres_y, centres_x)]
+
+
+def for_scanner(image):
+    # White-on-transparent is drawn on a dark card; scanners expect dark modules on light
+    card = Image.new("RGB", image.size, (0, 0, 0))
+    card.paste(image, (0, 0), image)
+    return ImageOps.expand(ImageOps.invert(card), border=40, fill=(255, 255, 255))
+
+
+def make_decoder():
+    try:
+        import cv2
+        detector = cv2.QRCodeDetector()
+        return "opencv", lambda image: detector.detectAndDecode(np.asarray(image))[0]
+    except ImportError:
+        pass
+    try:
+        from pyzbar import pyzbar
+        return "pyzbar", lambda image: next((r.data.decode() for r in pyzbar.decode(image)), "")
+    except ImportError:
+        return None, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare QR_maker's QR renderers.")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    decoder_name, decode = make_decoder()
+    # ms/qr includes encoding the payload (same for both); render ms is the rasterization alone
+    qr_code = QR_maker.make_qrcode(URLS[0])
+    matrix = QR_maker.qr_matrix(URLS[0])
+    render_only = {
+        "resize": lambda: qr_code.make_image(fill_color="white", back_color="transparent")
+                                 .resize(QR_maker.QR_SIZE, Image.Resampling.LANCZOS).convert("RGBA"),
+        "matrix": lambda: QR_maker.render_qr_matrix(matrix),
+    }
+    print(f"{'renderer':>9} {'ms/qr':>7} {'render ms':>10} {'module check':>13} {'decode check':>13}")
+    for renderer in ("resize", "matrix"):
+        seconds = timed(lambda: QR_maker.make_qrcode_image(URLS[0], renderer), args.repeat)
+        render_seconds = timed(render_only[renderer], args.repeat)
+        modules_ok = decoded_ok = 0
+        for url in URLS:
+            image = QR_maker.make_qrcode_image(url, renderer)
+            matrix = QR_maker.qr_matrix(url)
+            modules_ok += bool((sample_modules(image, matrix.shape[0], renderer) == matrix).all())
+            if decode:
+                expected = url if url.startswith("https://") else "https://" + url
+                decoded_ok += decode(for_scanner(image)) == expected
+        decode_result = f"{decoded_ok}/{len(URLS)}" if decode else "skipped"
+        print(f"{renderer:>9} {seconds * 1000:>7.2f} {render_seconds * 1000:>10.2f} "
+              f"{modules_ok:>10}/{len(URLS)} {decode_result:>13}")
+    if not decode:
+        print("decode check skipped: install opencv-python or pyzbar for a local decoder")
+    else:
+        print(f"decoder: {decoder_name}")
+
+
+if __name__ == "__main__":
+    main()
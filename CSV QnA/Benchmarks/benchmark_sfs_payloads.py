@@ -0,0 +1,59 @@
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # "CSV QnA", for survey_common
+import pandas as pd
+from survey_common import sfs_codec
+# python version 3.11
+
+# Payload size and parse time of the SFS payload types on a synthetic survey export:
+# reading the whole frame, and reading only the answer column (what the top-K handlers need).
+
+WORDS = ("staff", "friendly", "wait", "time", "long", "clean", "room", "price", "great", "service",
+         "parking", "slow", "helpful", "food", "cold", "booking", "easy", "noisy", "value", "again")
+
+
+def make_survey(rows, seed=0):
+    rng = random.Random(seed)
+    return pd.DataFrame({
+        "ID": range(rows),
+        "Answer": [" ".join(rng.choices(WORDS, k=rng.randint(3, 40))) for _ in range(rows)],
+        "Segment": [rng.choice(("new", "returning", "staff")) for _ in range(rows)],
+        "Submitted": pd.Timestamp("2025-03-01") + pd.to_timedelta([rng.randrange(30 * 86400) for _ in range(rows)], unit="s"),
+        "Score": [rng.randint(0, 10) for _ in range(rows)],
+    })
+
+
+def timed(function, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare SFS payload types.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'payload':>13} {'MB':>8} {'encode s':>9} {'read_df s':>10} {'column s':>9}")
+    for rows in args.rows:
+        df = make_survey(rows)
+        for payload in sfs_codec.PAYLOAD_FORMATS:
+            start = time.perf_counter()
+            sfs_data = sfs_codec.df_to_sfs(df, f"survey.{payload}", payload)
+            encode_seconds = time.perf_counter() - start
+            assert sfs_codec.payload_format(sfs_data) == payload
+            assert sfs_codec.read_column(sfs_data, 1).equals(df["Answer"])
+            read_seconds = timed(lambda: sfs_codec.read_df(sfs_data))
+            column_seconds = timed(lambda: sfs_codec.read_column(sfs_data, 1))
+            print(f"{rows:>10} {payload:>13} {len(sfs_data['content']) / 1e6:>8.1f} "
+                  f"{encode_seconds:>9.2f} {read_seconds:>10.3f} {column_seconds:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+import argparse
+import base64
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+import synthetic_survey
+# python version 3.11
+
+# Benchmark suite for the Sentiment and Top-K pipelines and the data-cleaning scripts.
+# Every benchmark runs in a fresh child process so peak RSS belongs to that benchmark alone.
+# The child prepares its inputs untimed (e.g. building the SFS envelope), times the stage,
+# and reports wall time, CPU time, peak RSS and rows/sec; the parent collects one JSON
+# document per run so results can be diffed between versions.
+
+CSV_QNA = Path(__file__).resolve().parent.parent
+sys.path.append(str(CSV_QNA))
+import survey_common
+survey_common.add_script_dirs(*survey_common.COLLECTORS, survey_common.COLUMN_CONCATENATOR, survey_common.ROW_COUNTER)
+
+DEFAULT_ROWS = [10_000, 100_000]
+
+
+def install_stub_sentiment_model():
+    # Stands in for transformers.pipeline so the sentiment stage can be timed without
+    # downloading a model: keyword labels, same call signature and result shape
+    negative = set(synthetic_survey.NEGATIVE_WORDS)
+
+    def pipeline(task, model=None, device=None, **kwargs):
+        def classify(texts, batch_size=None, truncation=None, max_length=None):
+            return [{"label": "NEGATIVE" if negative.intersection(text.split()) else "POSITIVE", "score": 0.9}
+                    for text in texts]
+        return classify
+    stub = types.ModuleType("transformers")
+    stub.pipeline = pipeline
+    sys.modules["transformers"] = stub
+
+
+def read_answers(csv_path):
+    # Answers as written: stock replies like "N/A" stay text instead of becoming NaN
+    from survey_common import encoding_sniffer
+    import pandas as pd
+    with encoding_sniffer.open_text(csv_path) as csv_file:
+        return pd.read_csv(csv_file, keep_default_na=False).iloc[:, 1]
+
+
+def csv_envelope(csv_path):
+    # What csv_to_sfs_format produces: the survey as base64 UTF-8 CSV text
+    from survey_common import encoding_sniffer
+    with encoding_sniffer.open_text(csv_path) as csv_file:
+        return {"name": csv_path, "content": base64.b64encode(csv_file.read().encode("utf-8")).decode("utf-8")}
+
+
+# Each benchmark is (prepare(csv_path, work_dir) -> state, run(state) -> rows processed);
+# prepare also does the imports, so module import time is never part of the timed stage
+def prepare_sfs_decode(csv_path, work_dir):
+    import pandas  # sfs_codec imports it lazily on first use
+    from survey_common import sfs_codec
+    return sfs_codec, csv_envelope(csv_path)
+
+
+def run_sfs_decode(state):
+    sfs_codec, sfs_data = state
+    return len(sfs_codec.read_df(sfs_data))
+
+
+def prepare_concatenation(csv_path, work_dir):
+    import concatenate_csv_final
+    return concatenate_csv_final, csv_path, os.path.join(work_dir, "concatenated.csv")
+
+
+def run_concatenation(state):
+    concatenate_csv_final, csv_path, output_path = state
+    return concatenate_csv_final.concatenate_csv_columns_streaming(csv_path, output_path) - 1
+
+
+def prepare_row_counting(csv_path, work_dir):
+    import count_records
+    return count_records, csv_path
+
+
+def run_row_counting(state):
+    count_records, csv_path = state
+    return count_records.scan_records(csv_path)["records"] - 1
+
+
+def prepare_vectorization(csv_path, work_dir):
+    import top_k_clusters2
+    return top_k_clusters2, read_answers(csv_path)
+
+
+def run_vectorization(state):
+    top_k_clusters2, documents = state
+    tfidf_matrix, feature_names = top_k_clusters2.do_tfidf(documents, 1, 3)
+    top_k_clusters2.get_top_K(5, top_k_clusters2.calc_percentages(len(documents), tfidf_matrix, feature_names))
+    return len(documents)
+
+
+def prepare_clustering(csv_path, work_dir):
+    import top_k_clusters4
+    documents = read_answers(csv_path)
+    return top_k_clusters4, top_k_clusters4.do_tfidf(documents, 1, 3)[0]
+
+
+def run_clustering(state):
+    top_k_clusters4, tfidf_matrix = state
+    top_k_clusters4.do_kmeans_clustering(5, tfidf_matrix, "minibatch")
+    return tfidf_matrix.shape[0]
+
+
+def prepare_sentiment(csv_path, work_dir):
+    install_stub_sentiment_model()
+    import make_sentiment_column2
+    return make_sentiment_column2, read_answers(csv_path)
+
+
+def run_sentiment(state):
+    make_sentiment_column2, answers = state
+    labels = make_sentiment_column2.get_sentiments(answers)  # no cache: every row reaches the model
+    if isinstance(labels, str):
+        raise RuntimeError(labels)
+    return len(labels)
+
+
+BENCHMARKS = {
+    "sfs_decode": (prepare_sfs_decode, run_sfs_decode),
+    "concatenation": (prepare_concatenation, run_concatenation),
+    "row_counting": (prepare_row_counting, run_row_counting),
+    "vectorization": (prepare_vectorization, run_vectorization),
+    "clustering": (prepare_clustering, run_clustering),
+    "sentiment": (prepare_sentiment, run_sentiment),
+}
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_child(name, csv_path, work_dir):
+    prepare, run = BENCHMARKS[name]
+    state = prepare(csv_path, work_dir)
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    rows = run(state)
+    wall_seconds = time.perf_counter() - start
+    cpu_seconds = time.process_time() - cpu_start
+    return {
+        "benchmark": name,
+        "rows": rows,
+        "wall_seconds": round(wall_seconds, 4),
+        "cpu_seconds": round(cpu_seconds, 4),
+        "rows_per_sec": round(rows / wall_seconds, 1) if wall_seconds else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_in_subprocess(name, csv_path, work_dir):
+    completed = subprocess.run(
+        [sys.executable, __file__, "--child", name, "--input", csv_path, "--work-dir", work_dir],
+        capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        return {"benchmark": name, "error": completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])  # stages print progress before the result
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=CSV_QNA).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the pipeline benchmarks on synthetic surveys and emit JSON.")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS)
+    parser.add_argument("--benchmarks", nargs="+", choices=sorted(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--questions", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    parser.add_argument("--child", choices=sorted(BENCHMARKS), help=argparse.SUPPRESS)
+    parser.add_argument("--input", help=argparse.SUPPRESS)
+    parser.add_argument("--work-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.input, args.work_dir)))
+        return
+
+    report = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "runs": [],
+    }
+    with tempfile.TemporaryDirectory() as work_dir:
+        for rows in args.rows:
+            csv_path = os.path.join(work_dir, f"survey_{rows}.csv")
+            survey = synthetic_survey.generate_survey(csv_path, rows, args.questions, seed=args.seed)
+            for name in args.benchmarks:
+                result = run_in_subprocess(name, csv_path, work_dir)
+                result["survey"] = {key: value for key, value in survey.items() if key != "path"}
+                report["runs"].append(result)
+                print(f"{name:>14} {rows:>10} rows: {result.get('wall_seconds', result.get('error'))}", file=sys.stderr)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
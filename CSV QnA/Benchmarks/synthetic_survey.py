@@ -0,0 +1,112 @@
+import argparse
+import csv
+import io
+import math
+import random
+# python version 3.11
+
+# Deterministic synthetic survey exports for the benchmarks (the sample CSVs the scripts
+# reference don't ship). Same arguments and seed -> byte-identical file.
+# Layout matches what the collectors expect: col 1 a respondent ID, col 2 onwards free-text answers.
+
+STOCK_ANSWERS = ["N/A", "Good", "No comment", "Nothing to add", "All good, thanks", "Not sure", "-"]
+POSITIVE_WORDS = ["great", "friendly", "helpful", "clean", "easy", "excellent", "quick", "love"]
+NEGATIVE_WORDS = ["slow", "rude", "dirty", "expensive", "confusing", "broken", "late", "noisy"]
+TOPIC_WORDS = ["staff", "service", "price", "booking", "room", "food", "parking", "website", "support",
+               "checkout", "delivery", "app", "queue", "manager", "event", "workshop", "session", "café"]
+FILLER_WORDS = [f"term{i}" for i in range(3000)]  # long tail so vocabularies grow like real text
+NON_UTF8_PHRASES = ["the café was “great”", "résumé workshop – too long", "naïve question ‘why’"]
+
+
+def make_answer(rng, mean_words, sigma, multiline_rate):
+    # Answer length in words is log-normal: mostly short, with a long tail of essays
+    length = max(1, int(rng.lognormvariate(math.log(mean_words), sigma)))
+    words = []
+    for _ in range(length):
+        pick = rng.random()
+        if pick < 0.25:
+            words.append(rng.choice(TOPIC_WORDS))
+        elif pick < 0.35:
+            words.append(rng.choice(POSITIVE_WORDS))
+        elif pick < 0.43:
+            words.append(rng.choice(NEGATIVE_WORDS))
+        else:
+            words.append(FILLER_WORDS[min(int(rng.paretovariate(1.1)) - 1, len(FILLER_WORDS) - 1)])
+    if length > 8 and rng.random() < multiline_rate:
+        # multi-line answers are quoted fields spanning several physical lines
+        cut = rng.randint(1, length - 1)
+        return " ".join(words[:cut]) + ".\n" + " ".join(words[cut:])
+    return " ".join(words)
+
+
+def generate_survey(path, rows=10_000, questions=2, mean_words=12, sigma=0.8, duplicate_rate=0.1,
+                    multiline_rate=0.05, non_utf8_rate=0.001, seed=0):
+    """
+    Write a synthetic survey CSV and return a summary of what it contains.
+
+    Args:
+        path (str): Output CSV path
+        rows (int): Number of respondents (data rows)
+        questions (int): Number of free-text answer columns after the ID column
+        mean_words (float): Median answer length in words
+        sigma (float): Spread of the log-normal answer length
+        duplicate_rate (float): Share of answers taken from a few stock replies ("N/A", "Good", ...)
+        multiline_rate (float): Share of longer answers containing a line break
+        non_utf8_rate (float): Share of rows written as cp1252 (pasted from a spreadsheet)
+        seed (int): Random seed
+
+    Returns:
+        dict: Parameters plus counts of duplicate, multi-line and cp1252 rows and bytes written
+    """
+    rng = random.Random(seed)
+    counts = {"duplicate_answers": 0, "multiline_answers": 0, "non_utf8_rows": 0}
+    header = ["Respondent ID"] + [f"Q{q + 1}: What did you think of the {TOPIC_WORDS[q % len(TOPIC_WORDS)]}?"
+                                  for q in range(questions)]
+    line = io.StringIO()
+    writer = csv.writer(line)
+    with open(path, "wb") as out:
+        writer.writerow(header)
+        out.write(line.getvalue().encode("utf-8"))
+        for row_id in range(1, rows + 1):
+            answers = []
+            for _ in range(questions):
+                if rng.random() < duplicate_rate:
+                    answers.append(rng.choice(STOCK_ANSWERS))
+                    counts["duplicate_answers"] += 1
+                else:
+                    answer = make_answer(rng, mean_words, sigma, multiline_rate)
+                    counts["multiline_answers"] += "\n" in answer
+                    answers.append(answer)
+            encoding = "utf-8"
+            if rng.random() < non_utf8_rate:
+                answers[0] = f"{answers[0]} {rng.choice(NON_UTF8_PHRASES)}"
+                encoding = "cp1252"
+                counts["non_utf8_rows"] += 1
+            line.seek(0)
+            line.truncate()
+            writer.writerow([f"R{row_id:08d}"] + answers)
+            out.write(line.getvalue().encode(encoding))
+        bytes_written = out.tell()
+    return {"path": path, "rows": rows, "questions": questions, "mean_words": mean_words, "sigma": sigma,
+            "duplicate_rate": duplicate_rate, "multiline_rate": multiline_rate, "non_utf8_rate": non_utf8_rate,
+            "seed": seed, "bytes": bytes_written, **counts}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a deterministic synthetic survey CSV.")
+    parser.add_argument("path")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--questions", type=int, default=2)
+    parser.add_argument("--mean-words", type=float, default=12)
+    parser.add_argument("--sigma", type=float, default=0.8)
+    parser.add_argument("--duplicate-rate", type=float, default=0.1)
+    parser.add_argument("--multiline-rate", type=float, default=0.05)
+    parser.add_argument("--non-utf8-rate", type=float, default=0.001)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(generate_survey(args.path, args.rows, args.questions, args.mean_words, args.sigma,
+                          args.duplicate_rate, args.multiline_rate, args.non_utf8_rate, args.seed))
+
+
+if __name__ == "__main__":
+    main()
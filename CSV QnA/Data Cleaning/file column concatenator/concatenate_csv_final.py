@@ -1,6 +1,22 @@
 #!/usr/bin/env python3
 
+import codecs
 import csv
+import io
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[2]))  # "CSV QnA", for survey_common
+from survey_common import csv_scan, encoding_sniffer
+
+PARALLEL_CHUNK_BYTES = 64 * 1024 * 1024  # target size of each chunk handed to a worker
+SCAN_BLOCK_BYTES = 8 * 1024 * 1024
+
+
+def concatenate_row(row):
+    """Join column 2 onwards with newlines, filtering out empty values."""
+    return '\n'.join(str(value).strip() for value in row[1:] if value and str(value).strip())
 
 def concatenate_csv_columns(input_file, output_file):
     """
@@ -15,50 +31,32 @@ def concatenate_csv_columns(input_file, output_file):
     concatenated_results = []
     header_questions = None
     
-    # Try different encodings
-    encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1', 'utf-8-sig']
-    
-    for encoding in encodings:
-        try:
-            print(f"Trying encoding: {encoding}")
-            with open(input_file, 'r', encoding=encoding, newline='') as csvfile:
-                reader = csv.reader(csvfile)
+    # Detect the encoding once from a sample; undecodable bytes fall back per byte, so one pass suffices
+    encoding = encoding_sniffer.detect_file_encoding(input_file)
+    print(f"Detected encoding: {encoding}")
+    with encoding_sniffer.open_text(input_file, encoding) as csvfile:
+        reader = csv.reader(csvfile)
+        
+        # Process each row
+        for row_num, row in enumerate(reader):
+            if len(row) < 2:  # Skip rows with less than 2 columns
+                continue
                 
-                # Process each row
-                for row_num, row in enumerate(reader):
-                    if len(row) < 2:  # Skip rows with less than 2 columns
-                        continue
-                        
-                    # Get the ID (first column)
-                    row_id = row[0]
-                    
-                    # Get all columns from column 2 onwards (index 1 onwards)
-                    columns_to_concatenate = row[1:]
-                    
-                    # Convert all values to strings and concatenate them with newlines, filtering out empty values
-                    concatenated_string = '\n'.join(str(value).strip() for value in columns_to_concatenate if value and str(value).strip())
-                    
-                    # Store the result
-                    concatenated_results.append([row_id, concatenated_string])
-                    
-                    # Capture the header row (first row) questions for the new header
-                    if row_num == 0:
-                        header_questions = concatenated_string
+            # Get the ID (first column)
+            row_id = row[0]
             
-            print(f"Successfully read file with encoding: {encoding}")
-            break
+            # Concatenate columns 2 onwards (index 1 onwards) with newlines, filtering out empty values
+            concatenated_string = concatenate_row(row)
             
-        except UnicodeDecodeError:
-            print(f"Failed with encoding: {encoding}")
-            concatenated_results = []  # Reset for next attempt
-            continue
-        except Exception as e:
-            print(f"Error with encoding {encoding}: {str(e)}")
-            concatenated_results = []  # Reset for next attempt
-            continue
+            # Store the result
+            concatenated_results.append([row_id, concatenated_string])
+            
+            # Capture the header row (first row) questions for the new header
+            if row_num == 0:
+                header_questions = concatenated_string
     
     if not concatenated_results:
-        raise ValueError("Could not read the file with any of the tried encodings")
+        raise ValueError(f"No rows with at least 2 columns found in {input_file}")
     
     # Write results to CSV file
     with open(output_file, 'w', encoding='utf-8', newline='') as csvfile:
@@ -75,6 +73,155 @@ def concatenate_csv_columns(input_file, output_file):
     
     return concatenated_results
 
+def write_concatenated_rows(reader, writer):
+    """
+    Write ['ID', text] for each row as soon as it is read.
+
+    The first row with at least 2 columns becomes the header, matching
+    concatenate_csv_columns.
+
+    Returns:
+        int: Number of rows processed, including the header row
+    """
+    processed = 0
+    for row_num, row in enumerate(reader):
+        if len(row) < 2:  # Skip rows with less than 2 columns
+            continue
+        concatenated_string = concatenate_row(row)
+        if processed == 0:
+            writer.writerow(['ID', concatenated_string if row_num == 0 else None])
+        else:
+            writer.writerow([row[0], concatenated_string])
+        processed += 1
+    return processed
+
+
+def concatenate_csv_columns_streaming(input_file, output_file, encoding=None):
+    """
+    Same output as concatenate_csv_columns, but each row is written straight to
+    the output instead of being collected in memory first.
+
+    Args:
+        input_file (str): Path to the input CSV file
+        output_file (str): Path to the output file where results will be saved
+        encoding (str): Encoding of the input (default: detected from a sample)
+
+    Returns:
+        int: Number of rows processed, including the header row
+    """
+    if encoding is None:
+        encoding = encoding_sniffer.detect_file_encoding(input_file)
+        print(f"Detected encoding: {encoding}")
+    with encoding_sniffer.open_text(input_file, encoding) as csvfile, \
+            open(output_file, 'w', encoding='utf-8', newline='') as outfile:
+        processed = write_concatenated_rows(csv.reader(csvfile), csv.writer(outfile))
+
+    print(f"Concatenation complete! Results saved to: {output_file}")
+    print(f"Processed {processed} rows")
+    return processed
+
+
+def find_record_boundaries(input_file, chunk_bytes=PARALLEL_CHUNK_BYTES):
+    """
+    Byte offsets that split the file into chunks of roughly chunk_bytes, each
+    starting at the beginning of a CSV record.
+
+    Quoted fields are followed the way csv.reader reads them (see
+    survey_common.csv_scan), so a newline inside a quoted multi-line field is
+    never used as a split point, and a stray '"' inside an unquoted field
+    doesn't throw that off for the rest of the file.
+    """
+    import numpy as np
+    boundaries = [0]
+    position = 0  # file offset of buffer[0], always the start of a record
+    buffer = b''
+    next_target = chunk_bytes
+    with open(input_file, 'rb') as f:
+        while True:
+            block = f.read(SCAN_BLOCK_BYTES)
+            if not block:
+                break
+            buffer += block  # the unfinished record carried over from the last block, then this one
+            record_ends = position + csv_scan.record_end_offsets(buffer)
+            i = np.searchsorted(record_ends, next_target)
+            while i < len(record_ends):
+                boundaries.append(int(record_ends[i]) + 1)
+                next_target = boundaries[-1] + chunk_bytes
+                i = np.searchsorted(record_ends, next_target)
+            if len(record_ends):
+                buffer = buffer[record_ends[-1] + 1 - position:]
+                position = int(record_ends[-1]) + 1
+    end_of_file = position + len(buffer)
+    if end_of_file > boundaries[-1]:
+        boundaries.append(end_of_file)
+    return boundaries
+
+
+def concatenate_chunk(task):
+    """Worker: decode and concatenate the records in input_file[start:end]."""
+    input_file, start, end, encoding = task
+    with open(input_file, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode(encoding, errors=encoding_sniffer.FALLBACK_ERRORS)
+    results = []
+    first_row_kept = None
+    for row_num, row in enumerate(csv.reader(io.StringIO(text, newline=''))):
+        if row_num == 0:
+            first_row_kept = len(row) >= 2
+        if len(row) < 2:  # Skip rows with less than 2 columns
+            continue
+        results.append([row[0], concatenate_row(row)])
+    return results, first_row_kept
+
+
+def concatenate_csv_columns_parallel(input_file, output_file, workers=None, chunk_bytes=PARALLEL_CHUNK_BYTES):
+    """
+    Same output as concatenate_csv_columns for large files: the input is split at
+    record boundaries, chunks are concatenated in a process pool and written out
+    in their original order as they complete.
+
+    The split scans raw bytes for b'\n' and b'"', so it needs an encoding that
+    writes those characters as single ASCII bytes. UTF-16/32 files don't (and only
+    the first chunk would start with the BOM), so they are concatenated serially.
+
+    Args:
+        input_file (str): Path to the input CSV file
+        output_file (str): Path to the output file where results will be saved
+        workers (int): Number of worker processes (default: CPU count)
+        chunk_bytes (int): Approximate size of each chunk
+
+    Returns:
+        int: Number of rows processed, including the header row
+    """
+    encoding = encoding_sniffer.detect_file_encoding(input_file)
+    print(f"Detected encoding: {encoding}")
+    if '\n"'.encode(encoding).removeprefix(codecs.BOM_UTF8) != b'\n"':
+        print(f"{encoding} is not ASCII-compatible, concatenating serially")
+        return concatenate_csv_columns_streaming(input_file, output_file, encoding)
+
+    boundaries = find_record_boundaries(input_file, chunk_bytes)
+    print(f"Split {input_file} into {len(boundaries) - 1} chunks")
+    tasks = [(input_file, start, end, encoding) for start, end in zip(boundaries, boundaries[1:])]
+
+    processed = 0
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool, \
+            open(output_file, 'w', encoding='utf-8', newline='') as outfile:
+        writer = csv.writer(outfile)
+        for chunk_num, (results, first_row_kept) in enumerate(pool.map(concatenate_chunk, tasks)):
+            if results and processed == 0:
+                # First kept row is the header; its text only counts if it was row 0 of the file
+                header_questions = results[0][1] if chunk_num == 0 and first_row_kept else None
+                writer.writerow(['ID', header_questions])
+                writer.writerows(results[1:])
+            else:
+                writer.writerows(results)
+            processed += len(results)
+
+    print(f"Concatenation complete! Results saved to: {output_file}")
+    print(f"Processed {processed} rows")
+    return processed
+
+
 def main():
     # File paths
     input_file = "files to reference/Help Us Shape the Next RCS Workshop.(1-12) edited.csv"
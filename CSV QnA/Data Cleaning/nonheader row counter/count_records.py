@@ -0,0 +1,104 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[2]))  # "CSV QnA", for survey_common
+from survey_common import csv_scan
+
+BLOCK_BYTES = 16 * 1024 * 1024
+
+
+def scan_records(csv_file_path, block_bytes=BLOCK_BYTES):
+    """
+    Count logical CSV records by scanning the file in large binary blocks.
+
+    A newline only ends a record when it is outside a quoted field, so
+    multi-line answers and multi-line headers are counted once. Quotes are
+    read the way csv.reader reads them (see survey_common.csv_scan): a '"'
+    opens a quoted field only at the start of a field, so a stray quote in
+    an unquoted answer (My 5" screen) is plain text. Blank lines count as
+    empty records, as they do for csv.reader. Memory use is bounded by
+    block_bytes plus the longest record.
+
+    Args:
+        csv_file_path (str): Path to the CSV file
+        block_bytes (int): Bytes read per block
+
+    Returns:
+        dict: records, physical_lines, and header_lines (physical lines spanned
+        by the first record, i.e. the header)
+    """
+    records = 0
+    physical_lines = 0
+    header_lines = 0
+    buffer = b''  # always starts at the start of a record
+    last_byte = b'\n'
+    with open(csv_file_path, 'rb') as file:
+        while True:
+            block = file.read(block_bytes)
+            if not block:
+                break
+            lines_before_buffer = physical_lines - buffer.count(b'\n')
+            physical_lines += block.count(b'\n')
+            last_byte = block[-1:]
+            buffer += block
+            if b'"' not in buffer:
+                # fast path: every newline in this buffer ends a record
+                first_end = buffer.find(b'\n')
+                last_end = buffer.rfind(b'\n')
+                new_records = physical_lines - lines_before_buffer
+            else:
+                record_ends = csv_scan.record_end_offsets(buffer)
+                first_end = int(record_ends[0]) if len(record_ends) else -1
+                last_end = int(record_ends[-1]) if len(record_ends) else -1
+                new_records = len(record_ends)
+            if records == 0 and first_end != -1:
+                header_lines = lines_before_buffer + buffer.count(b'\n', 0, first_end + 1)
+            records += new_records
+            buffer = buffer[last_end + 1:]
+    if last_byte != b'\n':  # last line has no trailing newline
+        physical_lines += 1
+    if buffer:  # last record has no trailing newline
+        records += 1
+        header_lines = header_lines or physical_lines
+    return {"records": records, "physical_lines": physical_lines, "header_lines": header_lines}
+
+
+def count_non_header_records(csv_file_path):
+    """
+    Count the number of non-header records in a CSV file.
+
+    The header is the first logical record, however many physical lines it
+    spans, so multi-line headers need no hardcoded line count.
+
+    Args:
+        csv_file_path (str): Path to the CSV file
+
+    Returns:
+        int: Number of non-header records
+    """
+    try:
+        return max(scan_records(csv_file_path)["records"] - 1, 0)
+
+    except FileNotFoundError:
+        print(f"Error: File '{csv_file_path}' not found.")
+        return 0
+    except Exception as e:
+        print(f"Error reading file: {e}")
+        return 0
+
+
+def main():
+    # Path to the CSV file
+    csv_file = "output files/concatenated_results_final.csv"
+
+    try:
+        scan = scan_records(csv_file)
+    except FileNotFoundError:
+        print(f"Error: File '{csv_file}' not found.")
+        return
+
+    print(f"Number of non-header rows: {max(scan['records'] - 1, 0)}")
+    print(f"Header spans {scan['header_lines']} lines")
+    print(f"Total lines in file: {scan['physical_lines']}")
+
+if __name__ == "__main__":
+    main()
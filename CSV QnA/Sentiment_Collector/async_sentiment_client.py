@@ -0,0 +1,124 @@
+import asyncio
+import os
+import random
+import time
+import aiohttp
+# python version 3.11
+
+# Concurrent client for the remote sentiment API used by make_sentiment_column.get_sentiment.
+# Requests share one connection pool, are paced by a token bucket so the provider's rate
+# limit is respected, and are retried with exponential backoff on 429/5xx/network errors.
+# A row that still can't be labelled comes back as None (FAILED), not as a made-up "neutral",
+# so SentimentCache doesn't store it and the answer is sent again on the next run.
+
+JIGSAWSTACK_SENTIMENT_URL = "https://api.jigsawstack.com/v1/ai/sentiment"
+API_KEY = os.environ.get("JIGSAWSTACK_API_KEY", "")
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+FAILED = None  # label of a row the API didn't answer for
+
+
+class TokenBucket:
+    def __init__(self, rate_per_sec, burst=None):
+        self.rate = rate_per_sec
+        self.capacity = burst if burst is not None else max(1, rate_per_sec)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens=1):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+def parse_sentiment(response_json):
+    sentiment = (response_json.get('sentiment') or {}).get('sentiment') if isinstance(response_json, dict) else None
+    if not isinstance(sentiment, str):
+        return FAILED  # an error body or an unexpected shape, not an answer
+    if sentiment.lower() in ['positive']:
+        return 'positive'
+    elif sentiment.lower() in ['negative']:
+        return 'negative'
+    else:
+        return 'neutral'
+
+
+class AsyncSentimentClient:
+    def __init__(self, url=JIGSAWSTACK_SENTIMENT_URL, api_key=API_KEY, rate_per_sec=10, burst=None,
+                 max_concurrency=32, max_retries=3, backoff_base=0.5, timeout=30, batch_size=1, batch_field=None):
+        # batch_size > 1 only applies to endpoints that accept a list of texts under batch_field
+        # and answer with one result per text under "sentiments"
+        self.url = url
+        self.api_key = api_key
+        self.rate_per_sec = rate_per_sec
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.timeout = timeout
+        self.batch_size = batch_size if batch_field else 1
+        self.batch_field = batch_field
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+
+    async def _post(self, session, bucket, semaphore, payload):
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire()
+            retry_after = None
+            try:
+                async with semaphore, session.post(self.url, json=payload) as response:
+                    self.requests += 1
+                    if response.status in RETRYABLE_STATUSES and attempt < self.max_retries:
+                        retry_after = response.headers.get("Retry-After")
+                    else:
+                        response.raise_for_status()
+                        return await response.json()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == self.max_retries:
+                    raise
+            self.retries += 1
+            delay = float(retry_after) if retry_after and retry_after.isdigit() else self.backoff_base * 2 ** attempt
+            await asyncio.sleep(delay * (1 + random.random() * 0.1))  # jitter keeps retries from lining up
+
+    async def _classify_batch(self, session, bucket, semaphore, texts):
+        try:
+            if self.batch_size == 1:
+                labels = [parse_sentiment(await self._post(session, bucket, semaphore, {"text": texts[0]}))]
+            else:
+                response_json = await self._post(session, bucket, semaphore, {self.batch_field: texts})
+                results = response_json.get("sentiments")
+                if not isinstance(results, list) or len(results) != len(texts):
+                    # labels are matched to texts by position, so a short or missing list would shift them
+                    received = len(results) if isinstance(results, list) else "no"
+                    raise ValueError(f"expected {len(texts)} sentiments in the batch response, got {received}")
+                labels = [parse_sentiment(result) for result in results]
+        except Exception as e:
+            # a failed request is reported per row rather than failing the whole column
+            print(f"Error analyzing sentiment: {str(e)}")
+            labels = [FAILED] * len(texts)
+        self.failures += labels.count(FAILED)
+        return labels
+
+    async def classify_async(self, texts):
+        bucket = TokenBucket(self.rate_per_sec, self.burst)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        headers = {"x-api-key": self.api_key, "Content-Type": "application/json"}
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, headers=headers, timeout=timeout) as session:
+            batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+            results = await asyncio.gather(*(self._classify_batch(session, bucket, semaphore, b) for b in batches))
+        return [label for batch_labels in results for label in batch_labels]
+
+    def classify(self, texts):
+        return asyncio.run(self.classify_async(list(texts)))
+
+    def stats(self):
+        return {"requests": self.requests, "retries": self.retries, "failures": self.failures}
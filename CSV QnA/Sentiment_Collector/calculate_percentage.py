@@ -1,9 +1,15 @@
-import base64
-import pandas as pd
-from io import StringIO
 import json
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # "CSV QnA", for survey_common
+from survey_common import sfs_codec
+from survey_common import instrumentation
 # python version 3.11
 
+SENTIMENTS = ("positive", "neutral", "negative")
+SENTIMENT_COLUMN = "sentiment"
+DAY = "day"  # index level name for per-day breakdowns
+
 
 def sfs_to_df(sfs_data):
     if not isinstance(sfs_data, dict) or 'content' not in sfs_data:
@@ -11,13 +17,8 @@ def sfs_to_df(sfs_data):
     content = sfs_data['content']
     if not content:
         return []
-    try:
-        decoded_content = base64.b64decode(content).decode('utf-8')
-    except Exception:
-        decoded_content = content
-    csv_buffer = StringIO(decoded_content)
-    df = pd.read_csv(csv_buffer)
-    return df
+    # decoded lazily in slices instead of one whole-file string
+    return sfs_codec.read_df(content)
 
 
 def calculate_sentiment(df):
@@ -56,10 +57,98 @@ def calculate_sentiment(df):
     }
 
 
-def handler(sfs_data):
+# Grouped aggregation: counts per (group keys..., day) computed in one groupby over the
+# sentiment column and the grouping columns only, read as categoricals. A partial aggregate
+# is a DataFrame of counts (one column per sentiment plus "total") indexed by the group keys;
+# partials from chunks, files or worker processes are combined with merge_aggregates.
+
+
+def aggregate_counts(df, group_by=(), date_column=None, sentiment_column=SENTIMENT_COLUMN):
+    import pandas as pd
+    keys = [df[column] for column in group_by]
+    if date_column is not None:
+        keys.append(pd.to_datetime(df[date_column], errors="coerce").dt.normalize().rename(DAY))
+    if not keys:
+        keys.append(pd.Series("all", index=df.index, name="all"))
+    sentiments = df[sentiment_column].astype("category")
+    counts = (
+        df.groupby(keys + [sentiments], observed=True, dropna=False, sort=False)
+        .size()
+        .unstack(sentiment_column, fill_value=0)
+    )
+    aggregate = counts.reindex(columns=list(SENTIMENTS), fill_value=0)
+    # total includes blank and unexpected labels, like len(df) in calculate_sentiment
+    aggregate["total"] = counts.sum(axis=1)
+    aggregate.columns = list(aggregate.columns.astype(str))
+    return aggregate.astype("int64")
+
+
+def merge_aggregates(partials):
+    import pandas as pd
+    partials = [partial for partial in partials if partial is not None]
+    merged = pd.concat(partials)
+    return merged.groupby(level=list(range(merged.index.nlevels)), dropna=False, sort=True).sum()
+
+
+def aggregate_chunks(chunks, group_by=(), date_column=None, sentiment_column=SENTIMENT_COLUMN):
+    # Peak memory is one chunk plus the (small) running aggregate
+    merged = None
+    for chunk in chunks:
+        partial = aggregate_counts(chunk, group_by, date_column, sentiment_column)
+        merged = partial if merged is None else merge_aggregates([merged, partial])
+    return merged
+
+
+def needed_columns(group_by=(), date_column=None, sentiment_column=SENTIMENT_COLUMN):
+    columns = [sentiment_column, *group_by] + ([date_column] if date_column is not None else [])
+    dtypes = {column: "category" for column in [sentiment_column, *group_by]}
+    return columns, dtypes
+
+
+def aggregate_sfs(sfs_data, group_by=(), date_column=None, sentiment_column=SENTIMENT_COLUMN,
+                  chunksize=sfs_codec.DEFAULT_DF_CHUNKSIZE):
+    columns, dtypes = needed_columns(group_by, date_column, sentiment_column)
+    chunks = sfs_codec.iter_df_chunks(sfs_data, chunksize=chunksize, usecols=columns, dtype=dtypes)
+    return aggregate_chunks(chunks, group_by, date_column, sentiment_column)
+
+
+def aggregate_csv_file(csv_file_path, group_by=(), date_column=None, sentiment_column=SENTIMENT_COLUMN,
+                       chunksize=sfs_codec.DEFAULT_DF_CHUNKSIZE):
+    # Top-level and picklable, so it can be mapped over files in a process pool
+    import pandas as pd
+    columns, dtypes = needed_columns(group_by, date_column, sentiment_column)
+    with pd.read_csv(csv_file_path, chunksize=chunksize, usecols=columns, dtype=dtypes) as chunks:
+        return aggregate_chunks(chunks, group_by, date_column, sentiment_column)
+
+
+def summarize(aggregate):
+    # Same fields as calculate_sentiment, one row per group
+    import pandas as pd
+    summary = pd.DataFrame(index=aggregate.index)
+    summary["total_responses"] = aggregate["total"]
+    for sentiment in SENTIMENTS:
+        summary[f"num_{sentiment}"] = aggregate[sentiment]
+    for sentiment in SENTIMENTS:
+        fractions = aggregate[sentiment] / aggregate["total"].where(aggregate["total"] > 0)
+        summary[f"percent_{sentiment}"] = (fractions * 100).round(2).fillna(0)
+    return summary
+
+
+@instrumentation.traced("calculate_percentage.handler")
+def handler(sfs_data, group_by=None, date_column=None):
     try:
-        df_data = sfs_to_df(sfs_data)
-        sentiment_percentages = calculate_sentiment(df_data)
+        if group_by or date_column:
+            with instrumentation.span("calculate_percentage.aggregate") as stage:  # decode + groupby, chunked
+                aggregate = aggregate_sfs(sfs_data, group_by or (), date_column)
+                stage.set(rows=int(aggregate["total"].sum()))
+            with instrumentation.span("calculate_percentage.summarize", rows=len(aggregate)):
+                return summarize(aggregate).reset_index().to_dict(orient="records")
+        # Only the sentiment column is needed for the overall summary
+        with instrumentation.span("calculate_percentage.decode") as stage:
+            df_data = sfs_codec.read_df(sfs_data, usecols=[SENTIMENT_COLUMN], dtype={SENTIMENT_COLUMN: "category"})
+            stage.set(rows=len(df_data))
+        with instrumentation.span("calculate_percentage.count", rows=len(df_data)):
+            sentiment_percentages = calculate_sentiment(df_data)
         return sentiment_percentages
     except Exception as e:
         return None
\ No newline at end of file
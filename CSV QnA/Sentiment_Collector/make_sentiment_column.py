@@ -2,21 +2,23 @@ import base64
 import csv
 from io import StringIO
 import requests
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # "CSV QnA", for survey_common
+from survey_common import sfs_codec
+import sentiment_cache
+from survey_common import instrumentation
 # python version 3.11
 
+SENTIMENT_MODEL_ID = "jigsawstack/v1/ai/sentiment"  # part of the cache key; change it when the model changes
+
 def sfs_to_csv(sfs_data):
     if not isinstance(sfs_data, dict) or 'content' not in sfs_data:
         return None
     content = sfs_data['content']
     if not content:
         return []
-    try:
-        decoded_content = base64.b64decode(content).decode('utf-8')
-    except Exception:
-        decoded_content = content
-    csv_buffer = StringIO(decoded_content)
-    reader = csv.DictReader(csv_buffer)
-    return list(reader)
+    return list(sfs_codec.iter_dict_rows(content))
 def csv_to_sfs(csv_data, original_sfs):
     # Convert data to CSV format
     headers = list(csv_data[0].keys())
@@ -53,25 +55,48 @@ def get_sentiment(text):
     #     print(f"Error analyzing sentiment: {str(e)}")
     #     return 'neutral'
     return "neutral"  #NO ISSUES HERE I THINK
-def get_sentiments(csv_data):
+def get_sentiments(csv_data, cache=None, client=None):
+    rows_to_analyze = []
     for row in csv_data:
         # Get the first two columns (header names unknown); Analyze sentiment only for the 2nd column
         columns = list(row.keys())
         text = str(row[columns[1]]) # if row[columns[1]] is not None else ""
 
         if text.strip():
-            row['sentiment'] = get_sentiment(text.strip())
+            rows_to_analyze.append((row, text.strip()))
         else:
             row['sentiment'] = ""
 
-        # time.sleep(1)  # Rate limiting does not work
+    texts = [text for _, text in rows_to_analyze]
+    if client is None:
+        # get_sentiment is a stub that answers "neutral" without calling the API; its labels are
+        # never cached, or they would be served under SENTIMENT_MODEL_ID once the API is called
+        sentiments = [get_sentiment(text) for text in texts]
+    elif cache is None:
+        # async_sentiment_client.AsyncSentimentClient: concurrent, rate-limited requests
+        sentiments = client.classify(texts)
+    else:
+        # only answers the cache has never seen are sent for analysis
+        sentiments = cache.classify(texts, SENTIMENT_MODEL_ID, client.classify)
+    for (row, _), sentiment in zip(rows_to_analyze, sentiments):
+        # a row the API couldn't label (None) is reported neutral, as get_sentiment always did
+        row['sentiment'] = 'neutral' if sentiment is None else sentiment
 
-def handler(sfs_data):
+@instrumentation.traced("make_sentiment_column.handler")
+def handler(sfs_data, cache_path=sentiment_cache.SENTIMENT_CACHE_PATH, client=None):
     try:
-        csv_data = sfs_to_csv(sfs_data)
+        with instrumentation.span("make_sentiment_column.decode") as stage:
+            csv_data = sfs_to_csv(sfs_data)
+            stage.set(rows=len(csv_data or ()))
         if not csv_data:
             return None
-        get_sentiments(csv_data)
-        return csv_to_sfs(csv_data, sfs_data)
+        with instrumentation.span("make_sentiment_column.classify", rows=len(csv_data)):
+            if cache_path is None or client is None:  # the get_sentiment stub isn't cached
+                get_sentiments(csv_data, client=client)
+            else:
+                with sentiment_cache.SentimentCache(cache_path) as cache:
+                    get_sentiments(csv_data, cache, client)
+        with instrumentation.span("make_sentiment_column.encode", rows=len(csv_data)):
+            return csv_to_sfs(csv_data, sfs_data)
     except Exception as e:
         return None
\ No newline at end of file
@@ -1,17 +1,19 @@
 import base64
 import csv
 from io import StringIO
-import pandas as pd
-from transformers import pipeline
+import sentiment_model_pool
+import sentiment_cache
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # "CSV QnA", for survey_common
+from survey_common import sfs_codec
+from survey_common import instrumentation
 # python version 3.11
 
 
 def sfs_to_df(content):
     try:
-        decoded_content = base64.b64decode(content).decode('utf-8')
-        csv_buffer = StringIO(decoded_content)
-        df = pd.read_csv(csv_buffer)
-        return df
+        return sfs_codec.read_df(content)
     except Exception as e:
         return f"Exception occurred in sfs_to_df: {e}"
 
@@ -34,23 +36,37 @@ def df_to_sfs(df_data):
         return f"Exception occurred in df_to_sfs: {e}"
 
 
-def get_sentiments(raw_data, model="sentiment-analysis"):
+def get_sentiments(raw_data, model=sentiment_model_pool.DEFAULT_MODEL, device=sentiment_model_pool.DEFAULT_DEVICE,
+                   batch_size=sentiment_model_pool.DEFAULT_BATCH_SIZE, cache=None):
     try:
-        dict_data = [{"text": raw_datum} for raw_datum in raw_data.tolist()]
-        sentiment_pipeline = pipeline(model)
-        results = sentiment_pipeline(dict_data)
-        sentiment_labels = [result["label"] for result in results]
-        return sentiment_labels
+        texts = raw_data.fillna("").astype(str).tolist()
+
+        def classify(unseen_texts):
+            # model is loaded once per process and reused across handler calls
+            return sentiment_model_pool.get_pool().classify(unseen_texts, model=model, device=device, batch_size=batch_size)
+        if cache is None:
+            return classify(texts)
+        # keyed on the loaded checkpoint, so labels from a different default model are never reused
+        return cache.classify(texts, sentiment_model_pool.get_pool().checkpoint_id(model, device), classify)
     except Exception as e:
         return f"Exception occurred in get_sentiments: {e}"
 
 
-def handler(sfs_data):
+@instrumentation.traced("make_sentiment_column2.handler")
+def handler(sfs_data, cache_path=sentiment_cache.SENTIMENT_CACHE_PATH):
     try:
-        df_data = sfs_to_df(sfs_data)
+        with instrumentation.span("make_sentiment_column2.decode") as stage:
+            df_data = sfs_to_df(sfs_data)
+            stage.set(rows=len(df_data))
         data_to_analyze = df_data.iloc[:, 1]  # convert col 2 to a list
-        sentiment_list = get_sentiments(data_to_analyze)
+        with instrumentation.span("make_sentiment_column2.classify", rows=len(data_to_analyze)):
+            if cache_path is None:
+                sentiment_list = get_sentiments(data_to_analyze)
+            else:
+                with sentiment_cache.SentimentCache(cache_path) as cache:
+                    sentiment_list = get_sentiments(data_to_analyze, cache=cache)
         df_data["sentiments"] = sentiment_list
-        return df_to_sfs(df_data)
+        with instrumentation.span("make_sentiment_column2.encode", rows=len(df_data)):
+            return df_to_sfs(df_data)
     except Exception as e:
         return None
\ No newline at end of file
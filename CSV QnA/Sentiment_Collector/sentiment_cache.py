@@ -0,0 +1,139 @@
+import hashlib
+import os
+import sqlite3
+import time
+import unicodedata
+from pathlib import Path
+# python version 3.11
+
+# Persistent sentiment labels keyed by sha256(model id + normalised answer text).
+# Survey exports repeat the same short answers ("N/A", "Good") and get re-run for every
+# report, so only strings the cache has never seen reach the model.
+
+# Next to this module, so every run shares one cache whatever its working directory;
+# set SENTIMENT_CACHE_PATH to keep it somewhere else
+SENTIMENT_CACHE_PATH = os.environ.get("SENTIMENT_CACHE_PATH") or str(Path(__file__).resolve().parent / "sentiment_cache.sqlite3")
+DEFAULT_MAX_ENTRIES = 1_000_000
+EVICT_CHECK_INSERTS = 10_000  # the table is counted and trimmed once per this many inserts
+
+
+def normalize_text(text):
+    # "  Good!! " / "good!!" / "ＧＯＯＤ!!" share a key; punctuation is kept since it can flip sentiment
+    return " ".join(unicodedata.normalize("NFKC", str(text)).casefold().split())
+
+
+def cache_key(text, model_id):
+    return hashlib.sha256(f"{model_id}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class SentimentCache:
+    def __init__(self, path=SENTIMENT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES, evict_check_inserts=EVICT_CHECK_INSERTS):
+        self.path = path
+        self.max_entries = max_entries
+        self.evict_check_inserts = evict_check_inserts
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sentiments ("
+            "key TEXT PRIMARY KEY, label TEXT NOT NULL, last_used INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sentiments_last_used ON sentiments (last_used)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS lifetime_stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def get_many(self, keys):
+        found = {}
+        keys = list(keys)
+        for start in range(0, len(keys), 500):  # stay under SQLite's bound-parameter limit
+            batch = keys[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            found.update(self._conn.execute(
+                f"SELECT key, label FROM sentiments WHERE key IN ({placeholders})", batch
+            ).fetchall())
+        if found:
+            now = time.time_ns()
+            self._conn.executemany("UPDATE sentiments SET last_used = ? WHERE key = ?", [(now, k) for k in found])
+        return found
+
+    def put_many(self, labels_by_key):
+        now = time.time_ns()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO sentiments (key, label, last_used) VALUES (?, ?, ?)",
+            [(key, label, now) for key, label in labels_by_key.items()],
+        )
+        # COUNT(*) scans the whole table, so it only runs once evict_check_inserts rows have been
+        # written since the last check (counted in the database, across runs and processes);
+        # in between the cache can run over max_entries by at most that many rows
+        self._conn.execute(
+            "INSERT INTO lifetime_stats (name, value) VALUES ('inserts_since_evict', ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (len(labels_by_key),),
+        )
+        (inserted,) = self._conn.execute("SELECT value FROM lifetime_stats WHERE name = 'inserts_since_evict'").fetchone()
+        if inserted >= self.evict_check_inserts:
+            self._evict()
+
+    def _evict(self):
+        # Least recently used entries go first once the cache is over its bound
+        (entries,) = self._conn.execute("SELECT COUNT(*) FROM sentiments").fetchone()
+        if entries > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM sentiments WHERE key IN (SELECT key FROM sentiments ORDER BY last_used LIMIT ?)",
+                (entries - self.max_entries,),
+            )
+        self._conn.execute("UPDATE lifetime_stats SET value = 0 WHERE name = 'inserts_since_evict'")
+
+    def classify(self, texts, model_id, classify_fn):
+        # classify_fn receives only unseen texts (one per distinct key) and returns their labels in order.
+        # None marks a text it couldn't label (e.g. the request failed): it is returned as None and
+        # not stored, so the next run asks again instead of reusing a fallback label forever
+        keys = [cache_key(text, model_id) for text in texts]
+        labels_by_key = self.get_many(set(keys))
+        unseen = {}
+        for key, text in zip(keys, texts):
+            if key not in labels_by_key and key not in unseen:
+                unseen[key] = text
+        if unseen:
+            new_labels = classify_fn(list(unseen.values()))
+            labels_by_key.update(zip(unseen.keys(), new_labels))
+            self.put_many({key: label for key, label in zip(unseen.keys(), new_labels) if label is not None})
+        # Every row not sent to the model counts as a hit, including repeats within this call
+        self._record(hits=len(texts) - len(unseen), misses=len(unseen))
+        return [labels_by_key[key] for key in keys]
+
+    def _record(self, hits, misses):
+        self.hits += hits
+        self.misses += misses
+        self._conn.executemany(
+            "INSERT INTO lifetime_stats (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            [("hits", hits), ("misses", misses)],
+        )
+        self._conn.commit()
+
+    def stats(self):
+        lifetime = dict(self._conn.execute("SELECT name, value FROM lifetime_stats").fetchall())
+        (entries,) = self._conn.execute("SELECT COUNT(*) FROM sentiments").fetchone()
+
+        def ratio(hits, misses):
+            return round(hits / (hits + misses), 4) if hits + misses else 0.0
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": ratio(self.hits, self.misses),
+            "lifetime_hits": lifetime.get("hits", 0),
+            "lifetime_misses": lifetime.get("misses", 0),
+            "lifetime_hit_ratio": ratio(lifetime.get("hits", 0), lifetime.get("misses", 0)),
+        }
@@ -1,13 +1,22 @@
-import make_sentiment_column2 as msc
-import calculate_percentage
-import pandas as pd
+import argparse
 import base64
 from io import StringIO
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # "CSV QnA", for survey_common
+import make_sentiment_column2 as msc
+import calculate_percentage
+from survey_common import handler_client
+
+# With SFS_DAEMON_URL set the handlers run in handler_daemon's warm workers
+msc = handler_client.proxy(msc)
+calculate_percentage = handler_client.proxy(calculate_percentage)
 
 def csv_to_sfs_format(csv_file_path):
     """
     Convert a CSV file to SFS format that the modules expect
     """
+    import pandas as pd
     # Read the CSV file
     df = pd.read_csv(csv_file_path)
     
@@ -36,9 +45,11 @@ def main(csv_file_path):
         print(f"Error generating report: {e}")
 
 if __name__ == "__main__":
-    # Example usage - you can change this to your CSV file path
-    csv_file = "cleaned data test input.csv"
-    main(csv_file)
+    parser = argparse.ArgumentParser(description="Add a sentiment column to a survey CSV (answers in column 2) and summarise it.")
+    # Example usage - you can change this default to your CSV file path
+    parser.add_argument("csv_file", nargs="?", default="cleaned data test input.csv")
+    args = parser.parse_args()
+    main(args.csv_file)
 
 
 
@@ -0,0 +1,110 @@
+import threading
+import time
+# python version 3.11
+
+# One sentiment pipeline per (task/model, device) per process. Loading the model
+# dominates short jobs, so handlers share the pool instead of calling pipeline() each time.
+
+DEFAULT_MODEL = "sentiment-analysis"
+DEFAULT_DEVICE = "cpu"
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_MAX_LENGTH = 512  # tokens; longer answers are truncated instead of failing
+
+
+def resolve_device(device=DEFAULT_DEVICE):
+    # "auto" picks the first GPU when torch can see one, otherwise the CPU
+    if device != "auto":
+        return device
+    try:
+        import torch
+        return "cuda:0" if torch.cuda.is_available() else "cpu"
+    except ImportError:
+        return "cpu"
+
+
+class ThroughputStats:
+    def __init__(self):
+        self.load_seconds = 0.0
+        self.rows = 0
+        self.batches = 0
+        self.inference_seconds = 0.0
+        self.max_batch_seconds = 0.0
+
+    def record_batch(self, rows, seconds):
+        self.rows += rows
+        self.batches += 1
+        self.inference_seconds += seconds
+        self.max_batch_seconds = max(self.max_batch_seconds, seconds)
+
+    def as_dict(self):
+        return {
+            "load_seconds": round(self.load_seconds, 3),
+            "rows": self.rows,
+            "batches": self.batches,
+            "rows_per_sec": round(self.rows / self.inference_seconds, 2) if self.inference_seconds else 0.0,
+            "mean_batch_ms": round(1000 * self.inference_seconds / self.batches, 2) if self.batches else 0.0,
+            "max_batch_ms": round(1000 * self.max_batch_seconds, 2),
+        }
+
+
+class SentimentModelPool:
+    def __init__(self):
+        self._models = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def get(self, model=DEFAULT_MODEL, device=DEFAULT_DEVICE):
+        key = (model, resolve_device(device))
+        with self._lock:
+            if key not in self._models:
+                start = time.perf_counter()
+                # transformers (and torch) take seconds to import: only pay that when a model is loaded
+                from transformers import pipeline
+                self._models[key] = pipeline(model, device=key[1])
+                self._stats[key] = ThroughputStats()
+                self._stats[key].load_seconds = time.perf_counter() - start
+        return self._models[key]
+
+    def checkpoint_id(self, model=DEFAULT_MODEL, device=DEFAULT_DEVICE):
+        # The checkpoint the pipeline actually loaded, e.g. "distilbert/...-sst-2-english@714eb0f".
+        # A task alias like "sentiment-analysis" maps to whatever the installed transformers
+        # defaults to, so it can't identify the labels on its own
+        loaded = getattr(self.get(model, device), "model", None)
+        name = getattr(loaded, "name_or_path", None) or model
+        revision = getattr(getattr(loaded, "config", None), "_commit_hash", None)
+        return f"{name}@{revision}" if revision else name
+
+    def classify(self, texts, model=DEFAULT_MODEL, device=DEFAULT_DEVICE,
+                 batch_size=DEFAULT_BATCH_SIZE, max_length=DEFAULT_MAX_LENGTH, sort_by_length=True):
+        sentiment_pipeline = self.get(model, device)
+        stats = self._stats[(model, resolve_device(device))]
+        # Bucket texts of similar length together so each batch pads to a similar size,
+        # then put the labels back in the original row order
+        order = list(range(len(texts)))
+        if sort_by_length:
+            order.sort(key=lambda i: len(texts[i]))
+        labels = [None] * len(texts)
+        for start in range(0, len(order), batch_size):
+            batch_indices = order[start:start + batch_size]
+            batch_start = time.perf_counter()
+            results = sentiment_pipeline(
+                [texts[i] for i in batch_indices],
+                batch_size=len(batch_indices),
+                truncation=True,
+                max_length=max_length,
+            )
+            stats.record_batch(len(batch_indices), time.perf_counter() - batch_start)
+            for i, result in zip(batch_indices, results):
+                labels[i] = result["label"]
+        return labels
+
+    def stats(self, model=DEFAULT_MODEL, device=DEFAULT_DEVICE):
+        stats = self._stats.get((model, resolve_device(device)))
+        return stats.as_dict() if stats else None
+
+
+_pool = SentimentModelPool()
+
+
+def get_pool():
+    return _pool
@@ -0,0 +1,147 @@
+import csv
+import hashlib
+import heapq
+import math
+import numpy as np
+import phrase_frequency
+import streaming_ngrams
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # "CSV QnA", for survey_common
+from survey_common import encoding_sniffer
+
+# Approximate top-K phrases in one pass and fixed memory.
+#
+# Every document contributes each of its distinct n-grams once (document frequency, as in
+# calc_percentages). Let N be the total number of such (document, phrase) increments.
+#
+# Count-Min Sketch (width = ceil(e / epsilon), depth = ceil(ln(1 / delta))):
+#   estimate >= true count, and estimate <= true count + epsilon * N with probability 1 - delta.
+# Space-Saving with `capacity` counters:
+#   every phrase with true count > N / capacity is guaranteed to be tracked, and each tracked
+#   count overestimates the true count by at most N / capacity.
+# A tracked phrase is reported with min(Space-Saving count, sketch estimate), which keeps both
+# upper bounds. Memory is depth * width counters plus `capacity` phrases, whatever the corpus size.
+
+DEFAULT_EPSILON = 1e-4
+DEFAULT_DELTA = 0.01
+DEFAULT_CAPACITY = 10_000
+
+
+class CountMinSketch:
+    def __init__(self, epsilon=DEFAULT_EPSILON, delta=DEFAULT_DELTA, buffer_size=65_536):
+        self.epsilon = epsilon
+        self.delta = delta
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.table = np.zeros((self.depth, self.width), dtype=np.int64)
+        self._row_offsets = np.arange(self.depth, dtype=np.uint64)
+        self._buffer = []
+        self._buffer_size = buffer_size
+
+    def _cells(self, items):
+        # Kirsch-Mitzenmacher: depth hash functions derived from two 32-bit hashes per item;
+        # returns flat indices into table, shape (len(items), depth)
+        digests = b"".join(hashlib.blake2b(item.encode('utf-8'), digest_size=8).digest() for item in items)
+        halves = np.frombuffer(digests, dtype='<u4').reshape(-1, 2).astype(np.uint64)
+        h1, h2 = halves[:, :1], halves[:, 1:] | np.uint64(1)
+        columns = (h1 + self._row_offsets * h2) % np.uint64(self.width)
+        return (self._row_offsets * np.uint64(self.width) + columns).astype(np.intp)
+
+    def add(self, item):
+        # Increments are buffered and applied in bulk; estimate() flushes first
+        self._buffer.append(item)
+        if len(self._buffer) >= self._buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            cells = self._cells(self._buffer).ravel()
+            self.table += np.bincount(cells, minlength=self.table.size).reshape(self.table.shape)
+            self._buffer = []
+
+    def estimate(self, item):
+        self.flush()
+        return int(self.table.ravel()[self._cells([item])[0]].min())
+
+
+class SpaceSaving:
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self._heap = []  # (count, item); entries go stale when a count grows and are fixed lazily
+
+    def add(self, item):
+        if item in self.counts:
+            self.counts[item] += 1
+            return
+        if len(self.counts) < self.capacity:
+            self.counts[item] = 1
+            self.errors[item] = 0
+            heapq.heappush(self._heap, (1, item))
+            return
+        # Replace the phrase with the smallest count; the newcomer inherits it as its error
+        while True:
+            count, evicted = heapq.heappop(self._heap)
+            if self.counts[evicted] == count:
+                break
+            heapq.heappush(self._heap, (self.counts[evicted], evicted))
+        del self.counts[evicted]
+        del self.errors[evicted]
+        self.counts[item] = count + 1
+        self.errors[item] = count
+        heapq.heappush(self._heap, (count + 1, item))
+
+
+class ApproximatePhraseCounter:
+    def __init__(self, min_phrase_length=1, max_phrase_length=3,
+                 epsilon=DEFAULT_EPSILON, delta=DEFAULT_DELTA, capacity=DEFAULT_CAPACITY):
+        self.analyzer = streaming_ngrams.build_analyzer(min_phrase_length, max_phrase_length)
+        self.sketch = CountMinSketch(epsilon, delta)
+        self.heavy_hitters = SpaceSaving(capacity)
+        self.total_docs = 0
+        self.total_increments = 0
+
+    def add_document(self, document):
+        self.total_docs += 1
+        if not isinstance(document, str):
+            return
+        for phrase in set(self.analyzer(document)):
+            self.sketch.add(phrase)
+            self.heavy_hitters.add(phrase)
+            self.total_increments += 1
+
+    def error_bounds(self):
+        # Worst-case overestimate of a document count, as a number of documents
+        return {
+            "sketch": self.sketch.epsilon * self.total_increments,
+            "sketch_confidence": 1 - self.sketch.delta,
+            "space_saving": self.total_increments / self.heavy_hitters.capacity,
+        }
+
+    def phrase_percentages(self, min_df=2, max_df=0.95):
+        # Same pruning rules as the vectorizers, applied to the estimated document counts
+        max_doc_count = max_df * self.total_docs
+        phrase_percentage_pairs = []
+        self.sketch.flush()
+        for phrase in sorted(self.heavy_hitters.counts):
+            estimate = min(self.heavy_hitters.counts[phrase], self.sketch.estimate(phrase))
+            if min_df <= estimate <= max_doc_count:
+                phrase_percentage_pairs.append((phrase, (estimate / self.total_docs) * 100))
+        return phrase_percentage_pairs
+
+    def top_k(self, K, min_df=2, max_df=0.95):
+        # Pairs are in phrase order so ties break alphabetically, like the exact collectors
+        return phrase_frequency.top_k_pairs(K, self.phrase_percentages(min_df, max_df))
+
+
+def top_k_from_csv(csv_file_path, K=5, **counter_kwargs):
+    # One pass over the response column (col 2) straight from the file, no DataFrame
+    phrase_counter = ApproximatePhraseCounter(**counter_kwargs)
+    with encoding_sniffer.open_text(csv_file_path) as csv_file:
+        reader = csv.reader(csv_file)
+        next(reader, None)  # header
+        for row in reader:
+            phrase_counter.add_document(row[1] if len(row) > 1 else None)
+    return phrase_counter.top_k(K)
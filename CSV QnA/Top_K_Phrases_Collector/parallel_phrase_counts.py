@@ -0,0 +1,75 @@
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import streaming_ngrams
+
+# Map-reduce phrase document frequencies over a process pool.
+# map:    each worker tokenizes a contiguous shard of the response column with the same
+#         lowercase / stop-word / 1-3-gram analyzer as do_bow and do_tfidf, and returns a
+#         Counter of how many of its documents contain each phrase
+# reduce: shard Counters are summed into global counts; min_df / max_df pruning happens only
+#         after that, exactly as the vectorizers prune over the whole corpus
+# Phrases are then put in alphabetical order (get_feature_names_out order), so percentages
+# and top-K tie-breaking match the serial collectors exactly.
+
+SHARDS_PER_WORKER = 4  # a few shards per worker evens out uneven answer lengths
+
+_analyzers = {}  # per worker process, one analyzer per n-gram range
+
+
+def _get_analyzer(min_phrase_length, max_phrase_length):
+    key = (min_phrase_length, max_phrase_length)
+    if key not in _analyzers:
+        _analyzers[key] = streaming_ngrams.build_analyzer(min_phrase_length, max_phrase_length)
+    return _analyzers[key]
+
+
+def count_shard(documents, min_phrase_length=1, max_phrase_length=3):
+    analyzer = _get_analyzer(min_phrase_length, max_phrase_length)
+    doc_freqs = Counter()
+    for document in documents:
+        if not isinstance(document, str):
+            # what the vectorizers raise for missing answers
+            raise ValueError("np.nan is an invalid document, expected byte or unicode string.")
+        doc_freqs.update(set(analyzer(document)))
+    return doc_freqs
+
+
+def _count_shard_args(args):
+    return count_shard(*args)
+
+
+def shard(documents, n_shards):
+    size = -(-len(documents) // n_shards)
+    return [documents[start:start + size] for start in range(0, len(documents), size)]
+
+
+def document_frequencies(documents, workers=None, min_phrase_length=1, max_phrase_length=3):
+    documents = list(documents)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(documents) < 2:
+        return count_shard(documents, min_phrase_length, max_phrase_length)
+    shards = shard(documents, workers * SHARDS_PER_WORKER)
+    doc_freqs = Counter()
+    with ProcessPoolExecutor(workers) as pool:
+        for shard_doc_freqs in pool.map(_count_shard_args, [(s, min_phrase_length, max_phrase_length) for s in shards]):
+            doc_freqs.update(shard_doc_freqs)
+    return doc_freqs
+
+
+def prune(doc_freqs, total_docs, min_df=2, max_df=0.95):
+    # Vectorizer rules: integer min_df is a document count, float max_df a proportion of documents
+    max_doc_count = max_df if isinstance(max_df, int) else max_df * total_docs
+    if max_doc_count < min_df:
+        raise ValueError("max_df corresponds to < documents than min_df")
+    kept = sorted((phrase, count) for phrase, count in doc_freqs.items() if min_df <= count <= max_doc_count)
+    if not kept:
+        raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+    return kept
+
+
+def phrase_percentages(documents, workers=None, min_phrase_length=1, max_phrase_length=3, min_df=2, max_df=0.95):
+    # Same (phrase, percentage) pairs as calc_percentages on the do_bow / do_tfidf matrix
+    documents = list(documents)
+    doc_freqs = document_frequencies(documents, workers, min_phrase_length, max_phrase_length)
+    return [(phrase, (count / len(documents)) * 100) for phrase, count in prune(doc_freqs, len(documents), min_df, max_df)]
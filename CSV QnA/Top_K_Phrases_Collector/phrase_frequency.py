@@ -0,0 +1,22 @@
+import heapq
+import numpy as np
+
+
+def document_frequencies(matrix):
+    # Number of documents containing each phrase, in one pass over the sparse structure.
+    # Works for any non-negative weighting (counts, binary, TF-IDF).
+    csc_matrix = matrix.tocsc(copy=True)
+    csc_matrix.eliminate_zeros()
+    return np.diff(csc_matrix.indptr)
+
+
+def phrase_percentages(total_respondents, matrix, feature_names):
+    doc_freqs = document_frequencies(matrix)
+    percentages = (doc_freqs / total_respondents) * 100
+    return list(zip(feature_names, percentages.tolist()))
+
+
+def top_k_pairs(K, results):
+    # Partial selection: O(n log K) instead of sorting every pair.
+    # Same ordering (ties keep their original order) as sorted(..., reverse=True)[:K].
+    return heapq.nlargest(int(K), results, key=lambda x: x[1])
@@ -0,0 +1,151 @@
+import argparse
+import sqlite3
+from collections import Counter
+from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # "CSV QnA", for survey_common
+import streaming_ngrams
+import top_k_clusters as tkc_bow
+from survey_common import encoding_sniffer
+# python version 3.11
+
+# Persistent phrase document frequencies per survey.
+# Surveys stay open for weeks; each report run ingests only the rows whose ID (col 1) the
+# index hasn't seen, adds their distinct 1-3-grams to the stored counts, and answers top-K
+# with one indexed query. Tokenization is do_bow / do_tfidf's analyzer and the min_df /
+# max_df pruning is applied at query time, so results match a full recompute (see verify).
+
+PHRASE_INDEX_PATH = "phrase_index.sqlite3"
+
+
+def row_ids(df):
+    # Col 1 as text, "" where the ID is blank. read_survey_csv keeps IDs as written; for a frame
+    # pandas has typed itself, a float column (its guess once any ID is missing) maps 2.0 back to "2"
+    ids = df.iloc[:, 0]
+    if ids.dtype.kind == "f":
+        ids = ids.map(lambda value: "" if value != value else str(int(value)) if value.is_integer() else str(value))
+    return ids.fillna("").astype(str).str.strip()
+
+
+class PhraseIndex:
+    def __init__(self, path=PHRASE_INDEX_PATH, min_phrase_length=1, max_phrase_length=3):
+        self.path = path
+        self.analyzer = streaming_ngrams.build_analyzer(min_phrase_length, max_phrase_length)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS surveys (survey_id TEXT PRIMARY KEY, total_docs INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen_rows ("
+            "survey_id TEXT NOT NULL, row_id TEXT NOT NULL, PRIMARY KEY (survey_id, row_id))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS phrase_df ("
+            "survey_id TEXT NOT NULL, phrase TEXT NOT NULL, df INTEGER NOT NULL, PRIMARY KEY (survey_id, phrase))"
+        )
+        # Top-K reads walk this index in (df DESC, phrase ASC) order and stop after K rows
+        self._conn.execute("CREATE INDEX IF NOT EXISTS phrase_df_rank ON phrase_df (survey_id, df DESC, phrase)")
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def total_docs(self, survey_id):
+        row = self._conn.execute("SELECT total_docs FROM surveys WHERE survey_id = ?", (survey_id,)).fetchone()
+        return row[0] if row else 0
+
+    def unseen_rows(self, survey_id, df):
+        # Rows of df (ID in col 1) not yet ingested, first occurrence of each ID only.
+        # Rows without an ID are left out: there is no way to tell on the next run that they were counted
+        ids = row_ids(df)
+        seen = {row_id for (row_id,) in self._conn.execute(
+            "SELECT row_id FROM seen_rows WHERE survey_id = ?", (survey_id,))}
+        return df[(ids != "") & ~ids.isin(seen) & ~ids.duplicated()]
+
+    def ingest(self, survey_id, df):
+        # Returns the number of new rows added to the survey's counts
+        blank_ids = int((row_ids(df) == "").sum())
+        if blank_ids:
+            print(f"Skipped {blank_ids} rows with no ID in survey {survey_id!r}")
+        new_rows = self.unseen_rows(survey_id, df)
+        phrase_counts = Counter()
+        for document in new_rows.iloc[:, 1]:  # use col 2
+            if isinstance(document, str):
+                phrase_counts.update(set(self.analyzer(document)))
+        with self._conn:  # one transaction: counts, seen IDs and totals move together
+            self._conn.executemany(
+                "INSERT INTO phrase_df (survey_id, phrase, df) VALUES (?, ?, ?) "
+                "ON CONFLICT(survey_id, phrase) DO UPDATE SET df = df + excluded.df",
+                ((survey_id, phrase, count) for phrase, count in phrase_counts.items()),
+            )
+            self._conn.executemany(
+                "INSERT INTO seen_rows (survey_id, row_id) VALUES (?, ?)",
+                ((survey_id, row_id) for row_id in row_ids(new_rows)),
+            )
+            self._conn.execute(
+                "INSERT INTO surveys (survey_id, total_docs) VALUES (?, ?) "
+                "ON CONFLICT(survey_id) DO UPDATE SET total_docs = total_docs + excluded.total_docs",
+                (survey_id, len(new_rows)),
+            )
+        return len(new_rows)
+
+    def top_k(self, survey_id, K=5, min_df=2, max_df=0.95):
+        # Same (phrase, percentage) pairs and tie order (alphabetical) as calc_percentages + get_top_K
+        total = self.total_docs(survey_id)
+        if not total:
+            return []
+        rows = self._conn.execute(
+            "SELECT phrase, df FROM phrase_df WHERE survey_id = ? AND df >= ? AND df <= ? "
+            "ORDER BY df DESC, phrase ASC LIMIT ?",
+            (survey_id, min_df, max_df * total, int(K)),
+        )
+        return [(phrase, (df / total) * 100) for phrase, df in rows]
+
+    def verify(self, survey_id, df, K=5):
+        # Recompute from scratch with do_bow over the same de-duplicated rows and compare
+        ids = row_ids(df)
+        documents = df[(ids != "") & ~ids.duplicated()].iloc[:, 1]
+        bow_matrix, feature_names = tkc_bow.do_bow(documents, 1, 3)
+        expected = tkc_bow.get_top_K(K, tkc_bow.calc_percentages(len(documents), bow_matrix, feature_names))
+        actual = self.top_k(survey_id, K)
+        return {"match": actual == expected, "expected": expected, "actual": actual}
+
+
+def read_survey_csv(csv_file_path):
+    # IDs are read as the text in the file: left to pandas, one blank ID turns the column into
+    # floats and every "1" becomes "1.0", which no longer matches the IDs already ingested
+    import pandas as pd
+    with encoding_sniffer.open_text(csv_file_path) as csv_file:
+        return pd.read_csv(csv_file, converters={0: str})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Update a survey's phrase index and print its top-K phrases.")
+    parser.add_argument("csv_file")
+    parser.add_argument("--survey", help="survey key (default: CSV file name without extension)")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--index", default=PHRASE_INDEX_PATH)
+    parser.add_argument("--verify", action="store_true", help="compare against a full do_bow recompute")
+    args = parser.parse_args()
+
+    survey_id = args.survey or Path(args.csv_file).stem
+    df = read_survey_csv(args.csv_file)
+    with PhraseIndex(args.index) as index:
+        new_rows = index.ingest(survey_id, df)
+        print(f"Ingested {new_rows} new rows ({index.total_docs(survey_id)} total) for survey {survey_id!r}")
+        for phrase, percentage in index.top_k(survey_id, args.k):
+            print(f"{percentage:6.2f}%  {phrase}")
+        if args.verify:
+            result = index.verify(survey_id, df, args.k)
+            print("Verification:", "OK" if result["match"] else f"MISMATCH, expected {result['expected']}")
+
+
+if __name__ == "__main__":
+    main()
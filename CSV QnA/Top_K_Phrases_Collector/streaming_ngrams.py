@@ -0,0 +1,85 @@
+import numpy as np
+import phrase_frequency
+
+# Streaming phrase document frequencies for top_k_clusters2.
+# Instead of fitting a vocabulary of every 1-3-gram, n-grams are hashed into a fixed number
+# of buckets chunk by chunk and only the bucket document frequencies are accumulated.
+# A bounded bucket -> phrase map keeps a readable phrase for the heaviest buckets.
+# Distinct phrases that hash to the same bucket share its count, so n_features should be
+# well above the number of distinct phrases expected to survive min_df.
+# sklearn is imported by the functions that use it, so importing this module stays cheap.
+
+DEFAULT_N_FEATURES = 2 ** 22
+DEFAULT_HEAVY_HITTERS = 10_000
+
+
+def build_analyzer(min_phrase_length=1, max_phrase_length=3):
+    # Same lowercase / stop-word / n-gram rules as do_tfidf
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    return TfidfVectorizer(
+        lowercase=True,
+        stop_words='english',
+        ngram_range=(min_phrase_length, max_phrase_length)
+    ).build_analyzer()
+
+
+def phrase_buckets(phrases, n_features):
+    # Same bucket HashingVectorizer(alternate_sign=False) assigns to each feature
+    from sklearn.utils import murmurhash3_32
+    return [abs(murmurhash3_32(phrase, seed=0)) % n_features for phrase in phrases]
+
+
+def phrase_bucket(phrase, n_features):
+    return phrase_buckets([phrase], n_features)[0]
+
+
+class StreamingPhraseCounter:
+    def __init__(self, min_phrase_length=1, max_phrase_length=3,
+                 n_features=DEFAULT_N_FEATURES, heavy_hitters=DEFAULT_HEAVY_HITTERS):
+        from sklearn.feature_extraction.text import HashingVectorizer
+        self.analyzer = build_analyzer(min_phrase_length, max_phrase_length)
+        self.hashing_vectorizer = HashingVectorizer(
+            analyzer=lambda phrases: phrases,  # documents arrive already analyzed
+            n_features=n_features,
+            alternate_sign=False,
+            norm=None,
+            binary=True
+        )
+        self.n_features = n_features
+        self.heavy_hitters = heavy_hitters
+        self.doc_freqs = np.zeros(n_features, dtype=np.int64)
+        self.total_docs = 0
+        self.phrases = {}  # bucket -> phrase, for at most heavy_hitters buckets
+
+    def partial_fit(self, documents):
+        analyzed = [self.analyzer(doc) if isinstance(doc, str) else [] for doc in documents]
+        hashed_matrix = self.hashing_vectorizer.transform(analyzed)
+        self.doc_freqs += phrase_frequency.document_frequencies(hashed_matrix)
+        self.total_docs += len(analyzed)
+        phrases = list(set().union(*analyzed))
+        for bucket, phrase in zip(phrase_buckets(phrases, self.n_features), phrases):
+            self.phrases.setdefault(bucket, phrase)
+        self._prune()
+        return self
+
+    def _prune(self):
+        # Keep labels only for the buckets with the highest document frequency so far
+        if len(self.phrases) <= self.heavy_hitters:
+            return
+        buckets = np.fromiter(self.phrases.keys(), dtype=np.int64, count=len(self.phrases))
+        keep = buckets[np.argpartition(-self.doc_freqs[buckets], self.heavy_hitters)[:self.heavy_hitters]]
+        self.phrases = {int(bucket): self.phrases[int(bucket)] for bucket in keep}
+
+    def phrase_percentages(self, min_df=2, max_df=0.95):
+        # Same pruning rules as the vectorizers: absolute min_df, proportional max_df
+        max_doc_count = max_df * self.total_docs
+        phrase_percentage_pairs = []
+        for bucket, phrase in sorted(self.phrases.items(), key=lambda item: item[1]):
+            doc_freq = self.doc_freqs[bucket]
+            if min_df <= doc_freq <= max_doc_count:
+                phrase_percentage_pairs.append((phrase, float(doc_freq / self.total_docs) * 100))
+        return phrase_percentage_pairs
+
+    def top_k(self, K, min_df=2, max_df=0.95):
+        # Pairs are in phrase order, so ties break alphabetically as they do for get_feature_names_out
+        return phrase_frequency.top_k_pairs(K, self.phrase_percentages(min_df, max_df))
@@ -1,7 +1,10 @@
-import base64
-import pandas as pd
-from io import StringIO
-from sklearn.feature_extraction.text import CountVectorizer  # bag-of-words + n-grams
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # "CSV QnA", for survey_common
+from survey_common import sfs_codec
+from survey_common import instrumentation
+import phrase_frequency
+import parallel_phrase_counts
 
 
 def sfs_to_df(sfs_data):
@@ -10,16 +13,12 @@ def sfs_to_df(sfs_data):
     content = sfs_data['content']
     if not content:
         return []
-    try:
-        decoded_content = base64.b64decode(content).decode('utf-8')
-    except Exception:
-        decoded_content = content
-    csv_buffer = StringIO(decoded_content)
-    df = pd.read_csv(csv_buffer)
-    return df
+    # decoded lazily in slices instead of one whole-file string
+    return sfs_codec.read_df(content)
 
 
 def do_bow(documents, min_phrase_length=1, max_phrase_length=3):
+    from sklearn.feature_extraction.text import CountVectorizer  # bag-of-words + n-grams
     count_vectorizer = CountVectorizer(
         lowercase=True,
         stop_words='english',
@@ -33,32 +32,31 @@ def do_bow(documents, min_phrase_length=1, max_phrase_length=3):
 
 
 def calc_percentages(total_respondents, bow_matrix, feature_names):
-    phrase_freq_pairs = {}
-    for i, phrase in enumerate(feature_names):
-        # Binary count non-zero entries in the bow matrix for this phrase
-        phrase_freq = (bow_matrix[:, i] > 0).sum()
-        phrase_freq_pairs[phrase] = phrase_freq
-    phrase_percentage_pairs = []
-    for phrase, count in phrase_freq_pairs.items():
-        percentage = (count / total_respondents) * 100
-        phrase_percentage_pair = (phrase, percentage)
-        phrase_percentage_pairs.append(phrase_percentage_pair)
-    return phrase_percentage_pairs
+    # Binary count non-zero entries in the bow matrix for every phrase at once
+    return phrase_frequency.phrase_percentages(total_respondents, bow_matrix, feature_names)
 
 
 def get_top_K(K, results):
-    results.sort(key=lambda x: x[1], reverse=True)
-    top_k_ngrams = results[:K]
-    return top_k_ngrams
+    return phrase_frequency.top_k_pairs(K, results)
 
 
+@instrumentation.traced("top_k_clusters.handler")
 def handler(input_data):
     sfs_file = input_data.get("File")
     K = input_data.get("K", 5)
-    df = sfs_to_df(sfs_file)
-    documents = df.iloc[:, 1]  # use col 2
-
-    bow_matrix, feature_names = do_bow(documents, 1, 3)
-    phrase_percentage_pairs = calc_percentages(len(documents), bow_matrix, feature_names)
-    top_k_ngrams = get_top_K(K, phrase_percentage_pairs)
+    workers = input_data.get("Workers")  # > 1: tokenize and count across a process pool
+    with instrumentation.span("top_k_clusters.decode") as stage:
+        documents = sfs_codec.read_column(sfs_file, 1)  # use col 2; other columns are not parsed
+        stage.set(rows=len(documents))
+
+    if workers and workers > 1:
+        with instrumentation.span("top_k_clusters.parallel_counts", rows=len(documents), workers=workers):
+            phrase_percentage_pairs = parallel_phrase_counts.phrase_percentages(documents, workers, 1, 3)
+    else:
+        with instrumentation.span("top_k_clusters.vectorize", rows=len(documents)):
+            bow_matrix, feature_names = do_bow(documents, 1, 3)
+        with instrumentation.span("top_k_clusters.percentages", rows=len(documents)):
+            phrase_percentage_pairs = calc_percentages(len(documents), bow_matrix, feature_names)
+    with instrumentation.span("top_k_clusters.top_k", rows=len(phrase_percentage_pairs)):
+        top_k_ngrams = get_top_K(K, phrase_percentage_pairs)
     return top_k_ngrams
\ No newline at end of file
@@ -1,16 +1,17 @@
-import base64
-import pandas as pd
-from io import StringIO
-from sklearn.feature_extraction.text import TfidfVectorizer  # TF-IDF + n-grams
 from typing import Dict, Any, List, Tuple
 import numpy as np
+import phrase_frequency
+import streaming_ngrams
+import parallel_phrase_counts
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # "CSV QnA", for survey_common
+from survey_common import sfs_codec
+from survey_common import instrumentation
 
 
 def sfs_to_df(content):
-    decoded_content = base64.b64decode(content).decode('utf-8')
-    csv_buffer = StringIO(decoded_content)
-    df = pd.read_csv(csv_buffer)
-    return df
+    return sfs_codec.read_df(content)
 
 
 def do_tfidf(
@@ -18,6 +19,7 @@ def do_tfidf(
     min_phrase_length: int = 1, 
     max_phrase_length: int = 3
 ) -> Tuple[np.ndarray, List[str]]:
+    from sklearn.feature_extraction.text import TfidfVectorizer  # TF-IDF + n-grams
     tfidf_vectorizer = TfidfVectorizer(
         lowercase=True,
         stop_words='english',
@@ -30,43 +32,64 @@ def do_tfidf(
     return tfidf_matrix, feature_names
 
 
+def do_streaming_tfidf(
+    document_chunks,
+    min_phrase_length: int = 1,
+    max_phrase_length: int = 3,
+    n_features: int = streaming_ngrams.DEFAULT_N_FEATURES
+) -> streaming_ngrams.StreamingPhraseCounter:
+    # Hashes n-grams chunk by chunk into a fixed-width feature space instead of
+    # building the full 1-3-gram vocabulary in memory
+    phrase_counter = streaming_ngrams.StreamingPhraseCounter(min_phrase_length, max_phrase_length, n_features)
+    for documents in document_chunks:
+        phrase_counter.partial_fit(documents)
+    return phrase_counter
+
+
 def calc_percentages(
     total_respondents: int, 
     tfidf_matrix: np.ndarray, 
     feature_names: List[str]
 ) -> List[Tuple[str, float]]:
-    phrase_freq_pairs = {}
-    for i, phrase in enumerate(feature_names):
-        # Binary count non-zero entries in the TF-IDF matrix for this phrase
-        phrase_freq = (tfidf_matrix[:, i] > 0).sum()
-        phrase_freq_pairs[phrase] = phrase_freq
-    phrase_percentage_pairs = []
-    for phrase, phrase_freq in phrase_freq_pairs.items():
-        percentage = (phrase_freq / total_respondents) * 100
-        phrase_percentage_pair = (phrase, percentage)
-        phrase_percentage_pairs.append(phrase_percentage_pair)
-    return phrase_percentage_pairs
+    # Binary count non-zero entries in the TF-IDF matrix for every phrase at once
+    return phrase_frequency.phrase_percentages(total_respondents, tfidf_matrix, feature_names)
 
 
 def get_top_K(
     K: int, 
     results: List[Tuple[str, float]]
 ) -> List[Tuple[str, float]]:
-    results.sort(key=lambda x: x[1], reverse=True)
-    top_k_ngrams = results[:K]
-    return top_k_ngrams
+    return phrase_frequency.top_k_pairs(K, results)
 
 
+@instrumentation.traced("top_k_clusters2.handler")
 def handler(input_data):
     try:
         sfs_file = input_data.get("File").get("content")
         K = input_data.get("K", 5)
-        df = sfs_to_df(sfs_file)
-        documents = df.iloc[:, 1]  # use col 2
+        if input_data.get("Mode") == "streaming":
+            with instrumentation.span("top_k_clusters2.streaming_counts") as stage:  # decode + hash, chunked
+                document_chunks = (chunk.iloc[:, 0] for chunk in sfs_codec.iter_df_chunks(sfs_file, usecols=[1]))  # use col 2
+                phrase_counter = do_streaming_tfidf(document_chunks, 1, 3)
+                stage.set(rows=phrase_counter.total_docs)
+            with instrumentation.span("top_k_clusters2.top_k"):
+                return phrase_counter.top_k(K)
+        with instrumentation.span("top_k_clusters2.decode") as stage:
+            documents = sfs_codec.read_column(sfs_file, 1)  # use col 2; other columns are not parsed
+            stage.set(rows=len(documents))
 
-        tfidf_matrix, feature_names = do_tfidf(documents, 1, 3)
-        phrase_percentage_pairs = calc_percentages(len(documents), tfidf_matrix, feature_names)
-        top_k_ngrams = get_top_K(K, phrase_percentage_pairs)
+        workers = input_data.get("Workers")  # > 1: tokenize and count across a process pool
+        if workers and workers > 1:
+            # same document frequencies as the TF-IDF matrix, without building it
+            with instrumentation.span("top_k_clusters2.parallel_counts", rows=len(documents), workers=workers):
+                phrase_percentage_pairs = parallel_phrase_counts.phrase_percentages(documents, workers, 1, 3)
+        else:
+            with instrumentation.span("top_k_clusters2.vectorize", rows=len(documents)):
+                tfidf_matrix, feature_names = do_tfidf(documents, 1, 3)
+            with instrumentation.span("top_k_clusters2.percentages", rows=len(documents)):
+                phrase_percentage_pairs = calc_percentages(len(documents), tfidf_matrix, feature_names)
+        with instrumentation.span("top_k_clusters2.top_k", rows=len(phrase_percentage_pairs)):
+            top_k_ngrams = get_top_K(K, phrase_percentage_pairs)
         return top_k_ngrams
     except Exception as e:
         print(f"Error: {e}")
@@ -1,13 +1,11 @@
-import base64
-import pandas as pd
-from io import StringIO
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # "CSV QnA", for survey_common
+from survey_common import sfs_codec
+from survey_common import instrumentation
 
 import numpy as np
-from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer
-from sklearn.cluster import KMeans
-from sklearn.decomposition import TruncatedSVD
-from sklearn.preprocessing import Normalizer
-from sklearn.pipeline import make_pipeline
+import clustering_backends
 
 
 def sfs_to_df(sfs_data):
@@ -16,16 +14,12 @@ def sfs_to_df(sfs_data):
     content = sfs_data['content']
     if not content:
         return []
-    try:
-        decoded_content = base64.b64decode(content).decode('utf-8')
-    except Exception:
-        decoded_content = content
-    csv_buffer = StringIO(decoded_content)
-    df = pd.read_csv(csv_buffer)
-    return df
+    # decoded lazily in slices instead of one whole-file string
+    return sfs_codec.read_df(content)
 
 
 def do_bow(documents, min_phrase_length=1, max_phrase_length=3):
+    from sklearn.feature_extraction.text import CountVectorizer
     count_vectorizer = CountVectorizer(
         lowercase=True,
         stop_words='english',
@@ -39,59 +33,53 @@ def do_bow(documents, min_phrase_length=1, max_phrase_length=3):
 
 
 def dimensionality_reduction(K, bow_matrix):
+    from sklearn.decomposition import TruncatedSVD
+    from sklearn.preprocessing import Normalizer
+    from sklearn.pipeline import make_pipeline
     lsa = make_pipeline(
         TruncatedSVD(n_components=min(100, K * 2)),  # Use fewer components if K is small
         Normalizer(copy=False)
     )
     bow_matrix_lsa = lsa.fit_transform(bow_matrix)
-    # Convert sparse matrix to dense for easier manipulation downstream
-    bow_matrix_dense = bow_matrix.toarray()  # Shape: (n_docs, n_features)
-    return bow_matrix_lsa, bow_matrix_dense
+    # Keep the bag-of-words sparse: densifying (n_docs x n_features) takes gigabytes on large surveys
+    return bow_matrix_lsa, bow_matrix.tocsr()
 
 
-def do_kmeans_clustering(K, documents, bow_matrix_lsa, bow_matrix_dense, feature_names):
-    kmeans = KMeans(
-        n_clusters=K,
+def do_kmeans_clustering(K, documents, bow_matrix_lsa, bow_matrix, feature_names, engine=clustering_backends.DEFAULT_ENGINE):
+    from scipy import sparse
+    cluster_labels, kmeans, fit_stats = clustering_backends.fit_predict(
+        engine, K, bow_matrix_lsa,
         n_init=10,  # Multiple runs for better initialization
         max_iter=300,
         random_state=42
     )
-    cluster_labels = kmeans.fit_predict(bow_matrix_lsa)
     # Calculate importance of each phrase within its cluster to balance intra-cluster relevance and cluster size
     # define importance as: (frequency in cluster / total frequency in corpus) * (cluster size / total documents)
-    phrase_importance = {}
-    # For each cluster, find the top phrases based on TF-IDF-like weighting within the cluster
+    total_docs = len(documents)
+    # Global term frequency across all documents, computed once for every phrase
+    global_tf = np.asarray(bow_matrix.sum(axis=0)).ravel()
+    # Term frequency of every phrase within every cluster: (K x n_docs) cluster indicator times BoW
+    n_docs = bow_matrix.shape[0]
+    cluster_indicator = sparse.csr_matrix(
+        (np.ones(n_docs, dtype=bow_matrix.dtype), (cluster_labels, np.arange(n_docs))),
+        shape=(K, n_docs)
+    )
+    cluster_tf_matrix = (cluster_indicator @ bow_matrix).tocsr()
+    cluster_sizes = np.bincount(cluster_labels, minlength=K)
+    # Avoid division by zero
+    has_global_tf = global_tf != 0
+    phrase_importance = np.zeros(int(has_global_tf.sum()))
     for cluster_id in range(K):
-        # Get documents belonging to this cluster
-        mask = (cluster_labels == cluster_id)
-        cluster_doc_indices = np.where(mask)[0]
         # If no documents in this cluster, skip
-        if len(cluster_doc_indices) == 0:
+        if cluster_sizes[cluster_id] == 0:
             continue
-        # Compute the average TF (term frequency) of each word within this cluster
-        cluster_tf = bow_matrix_dense[cluster_doc_indices].sum(axis=0)  # Sum across docs in cluster
-        # Total number of documents in the dataset
-        total_docs = len(documents)
-        # Cluster size
-        cluster_size = len(cluster_doc_indices)
-        # For each phrase, calculate its importance
-        for i, phrase in enumerate(feature_names):
-            # Term frequency within cluster
-            tf_in_cluster = cluster_tf[i]
-            # Global term frequency across all documents
-            global_tf = bow_matrix_dense[:, i].sum()
-            # Avoid division by zero
-            if global_tf == 0:
-                continue
-            # Weighted importance: higher if frequent in cluster and rare globally
-            # Also penalize if cluster is very small
-            importance = (tf_in_cluster / global_tf) * (cluster_size / total_docs)
-            # Accumulate importance across clusters
-            if phrase not in phrase_importance:
-                phrase_importance[phrase] = 0
-            phrase_importance[phrase] += importance
-    phrase_percentage_pairs = [(phrase, score) for phrase, score in phrase_importance.items()]
-    return phrase_percentage_pairs
+        cluster_tf = cluster_tf_matrix[cluster_id].toarray().ravel()
+        # Weighted importance: higher if frequent in cluster and rare globally
+        # Also penalize if cluster is very small
+        # Accumulated cluster by cluster, in the same order as before, so scores are bit-identical
+        phrase_importance += (cluster_tf[has_global_tf] / global_tf[has_global_tf]) * (cluster_sizes[cluster_id] / total_docs)
+    phrase_percentage_pairs = list(zip(np.asarray(feature_names)[has_global_tf].tolist(), phrase_importance.tolist()))
+    return phrase_percentage_pairs, fit_stats
 
 
 def get_top_K(K, results):
@@ -100,14 +88,24 @@ def get_top_K(K, results):
     return top_k_ngrams
 
 
+@instrumentation.traced("top_k_clusters3.handler")
 def handler(input_data):
     sfs_file = input_data.get("File")
     K = input_data.get("K", 5)
-    df = sfs_to_df(sfs_file)
-    documents = df.iloc[:, 1]  # use col 2
+    engine = input_data.get("Engine", clustering_backends.DEFAULT_ENGINE)  # "kmeans" or "minibatch"
+    with instrumentation.span("top_k_clusters3.decode") as stage:
+        documents = sfs_codec.read_column(sfs_file, 1)  # use col 2; other columns are not parsed
+        stage.set(rows=len(documents))
 
-    bow_matrix, feature_names = do_bow(documents, 1, 3)
-    bow_matrix_lsa, bow_matrix_dense = dimensionality_reduction(K, bow_matrix)
-    phrase_percentage_pairs = do_kmeans_clustering(K, documents, bow_matrix_lsa, bow_matrix_dense, feature_names)
-    top_k_ngrams = get_top_K(K, phrase_percentage_pairs)
+    with instrumentation.span("top_k_clusters3.vectorize", rows=len(documents)):
+        bow_matrix, feature_names = do_bow(documents, 1, 3)
+    with instrumentation.span("top_k_clusters3.svd", rows=len(documents)):
+        bow_matrix_lsa, bow_matrix = dimensionality_reduction(K, bow_matrix)
+    with instrumentation.span("top_k_clusters3.cluster", rows=len(documents), engine=engine):
+        phrase_percentage_pairs, fit_stats = do_kmeans_clustering(K, documents, bow_matrix_lsa, bow_matrix, feature_names, engine)
+    with instrumentation.span("top_k_clusters3.top_k", rows=len(phrase_percentage_pairs)):
+        top_k_ngrams = get_top_K(K, phrase_percentage_pairs)
+    if input_data.get("ReportStats"):
+        # fit time and inertia, to compare engines
+        return {"top_k": top_k_ngrams, "fit_stats": fit_stats}
     return top_k_ngrams
\ No newline at end of file
@@ -1,9 +1,10 @@
-import base64
-import pandas as pd
-from io import StringIO
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # "CSV QnA", for survey_common
+from survey_common import sfs_codec
+from survey_common import instrumentation
 
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import KMeans
+import clustering_backends
 
 
 def sfs_to_df(sfs_data):
@@ -12,16 +13,12 @@ def sfs_to_df(sfs_data):
     content = sfs_data['content']
     if not content:
         return []
-    try:
-        decoded_content = base64.b64decode(content).decode('utf-8')
-    except Exception:
-        decoded_content = content
-    csv_buffer = StringIO(decoded_content)
-    df = pd.read_csv(csv_buffer)
-    return df
+    # decoded lazily in slices instead of one whole-file string
+    return sfs_codec.read_df(content)
 
 
 def do_tfidf(documents, min_phrase_length=1, max_phrase_length=3):
+    from sklearn.feature_extraction.text import TfidfVectorizer
     tfidf_vectorizer = TfidfVectorizer(
         lowercase=True,
         stop_words='english',
@@ -33,13 +30,12 @@ def do_tfidf(documents, min_phrase_length=1, max_phrase_length=3):
     return tfidf_matrix, feature_names
 
 
-def do_kmeans_clustering(K, tfidf_matrix):
-    kmeans = KMeans(
-        n_clusters=K,
+def do_kmeans_clustering(K, tfidf_matrix, engine=clustering_backends.DEFAULT_ENGINE):
+    cluster_labels, kmeans, fit_stats = clustering_backends.fit_predict(
+        engine, K, tfidf_matrix,
         random_state=42
     )
-    cluster_labels = kmeans.fit_predict(tfidf_matrix)
-    return cluster_labels, kmeans
+    return cluster_labels, kmeans, fit_stats
 
 
 def get_top_terms_per_cluster(kmeans, feature_names, n_terms=10):
@@ -52,12 +48,22 @@ def get_top_terms_per_cluster(kmeans, feature_names, n_terms=10):
     return top_terms
 
 
+@instrumentation.traced("top_k_clusters4.handler")
 def handler(input_data):
     sfs_file = input_data.get("File")
     K = input_data.get("K", 5)
-    df = sfs_to_df(sfs_file)
-    documents = df.iloc[:, 1]  # use col 2
+    engine = input_data.get("Engine", clustering_backends.DEFAULT_ENGINE)  # "kmeans" or "minibatch"
+    with instrumentation.span("top_k_clusters4.decode") as stage:
+        documents = sfs_codec.read_column(sfs_file, 1)  # use col 2; other columns are not parsed
+        stage.set(rows=len(documents))
 
-    tfidf_matrix, feature_names = do_tfidf(documents, 1, 3)
-    cluster_labels, kmeans = do_kmeans_clustering(K, tfidf_matrix)
-    top_terms_per_cluster = get_top_terms_per_cluster(kmeans, feature_names)
\ No newline at end of file
+    with instrumentation.span("top_k_clusters4.vectorize", rows=len(documents)):
+        tfidf_matrix, feature_names = do_tfidf(documents, 1, 3)
+    with instrumentation.span("top_k_clusters4.cluster", rows=len(documents), engine=engine):
+        cluster_labels, kmeans, fit_stats = do_kmeans_clustering(K, tfidf_matrix, engine)
+    with instrumentation.span("top_k_clusters4.top_terms"):
+        top_terms_per_cluster = get_top_terms_per_cluster(kmeans, feature_names)
+    if input_data.get("ReportStats"):
+        # fit time and inertia, to compare engines
+        return {"top_terms_per_cluster": top_terms_per_cluster, "fit_stats": fit_stats}
+    return top_terms_per_cluster
\ No newline at end of file
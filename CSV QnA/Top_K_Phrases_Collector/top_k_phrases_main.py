@@ -1,28 +1,30 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # "CSV QnA", for survey_common
 # import top_k_clusters as tkc  # bag-of-words
 import top_k_clusters2 as tkc  # tf-idf
 # import top_k_clusters3 as tkc  # k-means using bow and tfidf?
 # import top_k_clusters4 as tkc  # k-means using tfidf?
 import top_k_formatter as tkf
-import pandas as pd
+import approximate_top_k
+import phrase_index
+import argparse
 import base64
 from io import StringIO
+from survey_common import encoding_sniffer
+from survey_common import handler_client
+
+# With SFS_DAEMON_URL set the handlers run in handler_daemon's warm workers
+tkc = handler_client.proxy(tkc)
+tkf = handler_client.proxy(tkf)
 
 
 def csv_to_sfs_format(csv_file_path):
-    # Try different encodings to read the CSV file
-    encodings = ['utf-8', 'utf-8-sig', 'latin-1', 'cp1252', 'iso-8859-1']
-    df = None
-    
-    for encoding in encodings:
-        try:
-            df = pd.read_csv(csv_file_path, encoding=encoding)
-            break
-        except UnicodeDecodeError:
-            continue
-    
-    # If all encodings fail, use latin-1 as fallback
-    if df is None:
-        df = pd.read_csv(csv_file_path, encoding='latin-1')
+    # Detect the encoding once from a sample and read the file in a single pass;
+    # bytes the detected encoding can't decode fall back to cp1252 individually
+    import pandas as pd
+    with encoding_sniffer.open_text(csv_file_path) as csv_file:
+        df = pd.read_csv(csv_file)
 
     # Convert DataFrame to CSV string
     csv_buffer = StringIO()
@@ -37,9 +39,20 @@ def csv_to_sfs_format(csv_file_path):
     return sfs_data
 
 
-def main(csv_file_path, K=5):
+def main(csv_file_path, K=5, approximate=False, index_path=None, survey_id=None):
     print(f"Processing CSV file: {csv_file_path}")
     try:
+        if index_path:
+            # Only rows the survey's index hasn't seen are tokenized; see phrase_index
+            with phrase_index.PhraseIndex(index_path) as index:
+                survey_id = survey_id or Path(csv_file_path).stem
+                index.ingest(survey_id, phrase_index.read_survey_csv(csv_file_path))
+                print(tkf.handler(index.top_k(survey_id, K)))
+            return
+        if approximate:
+            # One pass over the file in fixed memory; see approximate_top_k for the error bounds
+            print(tkf.handler(approximate_top_k.top_k_from_csv(csv_file_path, K)))
+            return
         sfs_data = csv_to_sfs_format(csv_file_path)
         # Use single parameter interface
         input_data = {
@@ -54,8 +67,13 @@ def main(csv_file_path, K=5):
 
 
 if __name__ == "__main__":
-    # Example usage - you can change this to your CSV file path
-    # csv_file = "questionnaire responses.csv"
-    csv_file = "survey data for sentiment-collector.csv"
-    # You can specify K (number of top phrases) as the second parameter
-    main(csv_file, "5")  # Get top 5 phrases
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Print the top-K phrases of a survey CSV (answers in column 2).")
+    # Example usage - you can change this default to your CSV file path
+    # e.g. "questionnaire responses.csv"
+    parser.add_argument("csv_file", nargs="?", default="survey data for sentiment-collector.csv")
+    parser.add_argument("--k", type=int, default=5, help="number of top phrases")
+    parser.add_argument("--approximate", action="store_true", help="one pass in fixed memory (approximate_top_k)")
+    parser.add_argument("--index", help="phrase index database; only rows it hasn't seen are tokenized")
+    parser.add_argument("--survey", help="survey key in the index (default: CSV file name without extension)")
+    args = parser.parse_args()
+    main(args.csv_file, args.k, approximate=args.approximate, index_path=args.index, survey_id=args.survey)
\ No newline at end of file
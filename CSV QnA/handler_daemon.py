@@ -0,0 +1,211 @@
+import argparse
+import importlib
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import survey_common
+from survey_common import handler_client
+survey_common.add_script_dirs(*survey_common.COLLECTORS)
+# python version 3.11
+
+# Long-running host for the SFS handlers, so a report doesn't pay a fresh interpreter, the
+# pandas / sklearn / transformers imports and the sentiment model load on every invocation.
+#   POST /<handler>  {"args": [...], "kwargs": {...}}  ->  {"result": ...}
+#   GET  /health     handlers, workers and request counters
+# Handlers run in a pool of worker processes; each one imports the handler modules, the
+# libraries they load lazily and the sentiment model once, when it starts. At most
+# workers + queue_size requests are accepted at a time, the rest get 503 with Retry-After
+# (handler_client retries them), so a burst queues briefly instead of piling up unbounded.
+# Point call sites at it with SFS_DAEMON_URL, see handler_client.
+#
+#   python handler_daemon.py --workers 2
+#   SFS_DAEMON_URL=http://127.0.0.1:8765 python Sentiment_Collector/sentiment_counter_main.py survey.csv
+#
+# Relative paths passed in handler arguments (e.g. a cache_path) resolve against the daemon's
+# working directory.
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 16
+RETRY_AFTER_SECONDS = 1
+WARM_IMPORTS = ("pandas", "sklearn.feature_extraction.text")  # imported lazily by the handlers
+
+_handlers = {}  # per worker process: name -> handler function
+
+
+def _init_worker(preload_model):
+    for name in handler_client.HANDLERS:
+        _handlers[name] = importlib.import_module(name).handler
+    for module_name in WARM_IMPORTS:
+        importlib.import_module(module_name)
+    if preload_model:
+        try:
+            import sentiment_model_pool
+            sentiment_model_pool.get_pool().get()
+        except Exception as e:
+            # the other handlers are still served; make_sentiment_column2 reports the failure per request
+            print(f"handler_daemon: sentiment model not preloaded: {e}", file=sys.stderr)
+
+
+def _worker_pid():
+    return os.getpid()
+
+
+def run_handler(name, args, kwargs):
+    # JSON is encoded in the worker, so the server threads only move bytes
+    start = time.perf_counter()
+    result = _handlers[name](*args, **kwargs)
+    compute_seconds = time.perf_counter() - start
+    return json.dumps({"result": result}, default=handler_client.json_default), compute_seconds
+
+
+class HandlerDaemon(ThreadingHTTPServer):
+    def __init__(self, address, workers=DEFAULT_WORKERS, queue_size=DEFAULT_QUEUE_SIZE, preload_model=True):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.preload_model = preload_model
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._pool_lock = threading.Lock()
+        self.pool_generation = 0
+        self.counters = {"in_flight": 0, "served": 0, "failed": 0, "rejected": 0, "compute_seconds": 0.0}
+        # workers start before the socket is bound, so they don't inherit it
+        self._start_pool()
+        super().__init__(address, HandlerRequestHandler)
+
+    def _start_pool(self):
+        self.pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.preload_model,))
+        # submitting one task per worker starts them all now rather than on the first requests
+        for future in [self.pool.submit(_worker_pid) for _ in range(self.workers)]:
+            future.result()
+
+    def restart_pool(self, generation):
+        # A worker died (e.g. killed for memory) and the executor can't be used again.
+        # Every request that was using it ends up here; only the first one restarts it.
+        with self._pool_lock:
+            if generation != self.pool_generation:
+                return
+            old_pool = self.pool
+            self._start_pool()
+            self.pool_generation += 1
+        old_pool.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, name, args, kwargs):
+        # None when workers + queue_size requests are already waiting
+        if not self._slots.acquire(blocking=False):
+            self._count("rejected")
+            return None
+        self._count("in_flight")
+        try:
+            future = self.pool.submit(run_handler, name, args, kwargs)
+        except BrokenProcessPool:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future):
+        with self._lock:
+            self.counters["in_flight"] -= 1
+        self._slots.release()
+
+    def _count(self, counter, amount=1):
+        with self._lock:
+            self.counters[counter] += amount
+
+    def health(self):
+        with self._lock:
+            counters = dict(self.counters)
+        counters["compute_seconds"] = round(counters["compute_seconds"], 3)
+        return {"handlers": list(handler_client.HANDLERS), "workers": self.workers,
+                "queue_size": self.queue_size, **counters}
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class HandlerRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if self.path != "/health":
+            return self._send_json(404, {"error": f"unknown path {self.path}"})
+        self._send_json(200, self.server.health())
+
+    def do_POST(self):
+        name = self.path.strip("/")
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))  # read even if rejected, for keep-alive
+        if name not in handler_client.HANDLERS:
+            return self._send_json(404, {"error": f"unknown handler {name!r}, expected one of {handler_client.HANDLERS}"})
+        try:
+            request = json.loads(body or b"{}")
+            args, kwargs = list(request.get("args", [])), dict(request.get("kwargs", {}))
+        except (ValueError, TypeError, AttributeError) as e:
+            return self._send_json(400, {"error": f"bad request body: {e}"})
+        generation = self.server.pool_generation
+        try:
+            future = self.server.submit(name, args, kwargs)
+            if future is None:
+                return self._send_json(503, {"error": "handler queue full"}, {"Retry-After": str(RETRY_AFTER_SECONDS)})
+            payload, compute_seconds = future.result()
+        except BrokenProcessPool as e:
+            self.server.restart_pool(generation)
+            self.server._count("failed")
+            return self._send_json(500, {"error": f"worker process died: {e}"})
+        except Exception as e:
+            self.server._count("failed")
+            return self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+        self.server._count("served")
+        self.server._count("compute_seconds", compute_seconds)
+        self._send(200, payload.encode("utf-8"), {"X-Compute-Seconds": f"{compute_seconds:.6f}"})
+
+    def _send_json(self, status, payload, headers=None):
+        self._send(status, json.dumps(payload).encode("utf-8"), headers)
+
+    def _send(self, status, data, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for header, value in (headers or {}).items():
+            self.send_header(header, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the SFS handlers from warm worker processes on localhost.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help="requests allowed to wait for a worker before new ones get 503")
+    parser.add_argument("--no-preload-model", action="store_true", help="load the sentiment model on first use")
+    args = parser.parse_args()
+
+    server = HandlerDaemon((args.host, args.port), args.workers, args.queue_size, not args.no_preload_model)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    url = f"http://{args.host}:{server.server_port}"
+    print(f"Serving {', '.join(handler_client.HANDLERS)} on {url} with {args.workers} workers "
+          f"({handler_client.DAEMON_URL_ENV}={url})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
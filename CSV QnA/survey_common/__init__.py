@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+# python version 3.11
+
+# Modules shared by the collectors, the data-cleaning scripts and the benchmarks:
+#   from survey_common import sfs_codec, encoding_sniffer, instrumentation, handler_client
+# Every module in a script folder that imports survey_common puts "CSV QnA" on sys.path
+# first, so it can be run or imported from its own folder (handler modules are loaded that
+# way) as well as through the daemon, the pipeline and the tests:
+#   sys.path.append(str(Path(__file__).resolve().parents[1]))  # "CSV QnA", for survey_common
+# and a script that imports modules from other script folders (the handler daemon, the
+# pipeline, the benchmarks) adds those folders with add_script_dirs.
+
+CSV_QNA = Path(__file__).resolve().parent.parent
+SENTIMENT_COLLECTOR = CSV_QNA / "Sentiment_Collector"
+TOP_K_PHRASES_COLLECTOR = CSV_QNA / "Top_K_Phrases_Collector"
+COLLECTORS = (SENTIMENT_COLLECTOR, TOP_K_PHRASES_COLLECTOR)
+COLUMN_CONCATENATOR = CSV_QNA / "Data Cleaning" / "file column concatenator"
+ROW_COUNTER = CSV_QNA / "Data Cleaning" / "nonheader row counter"
+
+
+def _module_names(directory):
+    return {path.stem for path in directory.glob("*.py")}
+
+
+def add_script_dirs(*directories):
+    # The modules in a script folder import each other by bare name, so the folder itself goes
+    # on sys.path. If two folders on the path define a module of the same name the first one
+    # would win silently, so that is refused instead.
+    directories = [Path(directory).resolve() for directory in directories]
+    on_path = [Path(entry or ".").resolve() for entry in sys.path]
+    owners = {}
+    for directory in [entry for entry in on_path if entry.is_relative_to(CSV_QNA)] + directories:
+        for name in _module_names(directory):
+            owner = owners.setdefault(name, directory)
+            if owner != directory:
+                raise ImportError(f"module {name!r} is defined in both {owner} and {directory}")
+    for directory in directories:
+        if directory not in on_path:
+            sys.path.append(str(directory))
@@ -0,0 +1,56 @@
+import re
+# python version 3.11
+
+# Finds where CSV records end without parsing them, for splitting and counting large files.
+# Quotes are read the way the csv module's default dialect reads them: a '"' opens a quoted
+# field only at the start of a field; inside one, '""' is an escaped quote and a lone '"'
+# closes it. Any other '"' (1,My 5" screen,fine) is an ordinary character, as csv.reader
+# keeps it, and doesn't change whether later newlines are inside quotes.
+#
+# Counting quotes (every other quote opens a field) gives the same answer, and is fast with
+# numpy, as long as each quote it takes as opening really is at the start of a field (or is
+# the second half of a ""). record_end_offsets checks that and parses the buffer with RECORD
+# only when it isn't, e.g. when an answer contains a stray quote.
+
+QUOTE = ord('"')
+NEWLINE = ord('\n')
+FIELD_START_BYTES = (ord(','), ord('\r'), ord('\n'))  # a field starts after one of these
+
+# One record of the default dialect, newline included. Possessive quantifiers (3.11) keep the
+# match linear: nothing is retried once a run of text or a quoted field has been consumed.
+RECORD = re.compile(
+    rb'(?:[^"\n]++'                                # unquoted text
+    rb'|(?:(?<=[,\r\n])|^)"(?:[^"]++|"")*+"'       # a quoted field, "" escapes included
+    rb'|(?<=[^,\r\n])"'                            # a quote inside an unquoted field: plain text
+    rb')*+\n'
+)
+RECORDS = re.compile(rb'(?:' + RECORD.pattern + rb')*+')
+
+
+def _parity_is_exact(data, quotes):
+    # The quotes counting takes as opening: 0th, 2nd, 4th, ...
+    opening = quotes[::2]
+    previous = data[opening[opening > 0] - 1]
+    return bool(((previous == FIELD_START_BYTES[0]) | (previous == FIELD_START_BYTES[1]) |
+                 (previous == FIELD_START_BYTES[2]) | (previous == QUOTE)).all())
+
+
+def record_end_offsets(buffer):
+    """
+    Offsets of the newlines in buffer that end a record, as a numpy int64 array.
+
+    buffer must start at the start of a record. Newlines after the last complete
+    record (a record cut off at the end of the buffer) are not included, so a
+    caller reading in blocks carries buffer[offsets[-1] + 1:] into the next one.
+    """
+    import numpy as np
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    newlines = np.flatnonzero(data == NEWLINE)
+    quotes = np.flatnonzero(data == QUOTE)
+    if len(quotes) == 0:
+        return newlines
+    if _parity_is_exact(data, quotes):
+        # a newline is outside quotes when an even number of quotes come before it
+        return newlines[np.searchsorted(quotes, newlines) % 2 == 0]
+    complete = RECORDS.match(buffer).end()
+    return np.fromiter((match.end() - 1 for match in RECORD.finditer(buffer, 0, complete)), dtype=np.int64)
@@ -0,0 +1,80 @@
+import codecs
+# python version 3.11
+
+# Detect a file's encoding once from a bounded sample (BOM first, then strict UTF-8, then
+# chardet, as in concatenate_csv_simple.detect_file_encoding), then read it in a single pass.
+# Bytes that the detected encoding cannot decode (e.g. cp1252 rows pasted into a UTF-8
+# export) are decoded individually with FALLBACK_ENCODING by a codec error handler, so a bad
+# byte near the end of the file no longer costs another full pass with the next encoding.
+
+SAMPLE_BYTES = 200_000
+FALLBACK_ENCODING = 'cp1252'
+FALLBACK_ERRORS = 'encoding-sniffer-fallback'  # pass as errors= to open() / bytes.decode()
+
+# UTF-32 LE must be checked before UTF-16 LE since their BOMs share a prefix
+BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+fallback_stats = {"errors": 0, "bytes": 0}
+
+
+def _decode_fallback_byte(byte):
+    try:
+        return bytes([byte]).decode(FALLBACK_ENCODING)
+    except UnicodeDecodeError:
+        return chr(byte)  # the 5 bytes cp1252 leaves undefined map like latin-1
+
+
+def _fallback_error_handler(error):
+    if not isinstance(error, UnicodeDecodeError):
+        raise error
+    bad_bytes = error.object[error.start:error.end]
+    fallback_stats["errors"] += 1
+    fallback_stats["bytes"] += len(bad_bytes)
+    return "".join(_decode_fallback_byte(byte) for byte in bad_bytes), error.end
+
+
+codecs.register_error(FALLBACK_ERRORS, _fallback_error_handler)
+
+
+def detect_encoding_from_sample(sample, is_complete=False):
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+    # A multi-byte character may be cut off at the end of the sample
+    text = codecs.getincrementaldecoder('utf-8')(errors='surrogateescape').decode(sample, final=is_complete)
+    invalid_bytes = sum(1 for char in text if '\udc80' <= char <= '\udcff')
+    valid_non_ascii = sum(1 for char in text if char >= '\x80') - invalid_bytes
+    # cp1252 text almost never forms valid multi-byte UTF-8, so any valid sequence means a UTF-8
+    # export (possibly with a few pasted cp1252 rows, which the error handler takes care of)
+    if invalid_bytes == 0 or valid_non_ascii > 0:
+        return 'utf-8'
+    import chardet  # only needed for samples that aren't UTF-8
+    result = chardet.detect(sample) or {}
+    encoding = (result.get('encoding') or FALLBACK_ENCODING).lower()
+    # Normalize common aliases
+    if encoding in {'ascii'}:
+        encoding = 'utf-8'
+    return encoding
+
+
+def detect_file_encoding(file_path, sample_bytes=SAMPLE_BYTES):
+    with open(file_path, 'rb') as f:
+        sample = f.read(sample_bytes)
+    return detect_encoding_from_sample(sample, is_complete=len(sample) < sample_bytes)
+
+
+def open_text(file_path, encoding=None, **kwargs):
+    # Text-mode file (newline='' for the csv module) that never raises UnicodeDecodeError
+    encoding = encoding or detect_file_encoding(file_path)
+    return open(file_path, 'r', encoding=encoding, errors=FALLBACK_ERRORS, newline='', **kwargs)
+
+
+def decode_bytes(data, encoding=None):
+    encoding = encoding or detect_encoding_from_sample(data[:SAMPLE_BYTES], is_complete=len(data) <= SAMPLE_BYTES)
+    return data.decode(encoding, errors=FALLBACK_ERRORS)
@@ -0,0 +1,90 @@
+import http.client
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+# python version 3.11
+
+# Thin client for handler_daemon.
+# With SFS_DAEMON_URL set (e.g. http://127.0.0.1:8765), proxy(module) returns a stand-in whose
+# handler() runs in the daemon and whose other attributes are the module's own, so call sites
+# like msc.handler(sfs_data) stay as they are. Without it, or when the daemon can't be
+# reached or drops the connection, the module's own handler runs in this process.
+# Arguments and results travel as JSON: tuples come back as lists, numpy numbers as Python numbers.
+
+DAEMON_URL_ENV = "SFS_DAEMON_URL"
+HANDLERS = ("make_sentiment_column2", "calculate_percentage", "top_k_clusters2", "top_k_formatter")
+DEFAULT_TIMEOUT = 600  # seconds; the sentiment stage on a large survey takes minutes
+DEFAULT_RETRIES = 5  # 503 responses (daemon queue full) retried after Retry-After
+
+# What each handler returns when it fails locally, for a handler that failed in the daemon (500).
+# A handler not listed here raises when it fails, so its daemon failures raise RuntimeError.
+ERROR_RESULTS = {
+    "make_sentiment_column2": lambda message: None,
+    "calculate_percentage": lambda message: None,
+    "top_k_clusters2": lambda message: {"error": message},
+}
+
+
+def json_default(value):
+    # numpy scalars and arrays (value_counts() counts, percentages), pandas timestamps
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _error_message(http_error):
+    try:
+        return json.loads(http_error.read())["error"]
+    except (ValueError, KeyError):
+        return f"HTTP {http_error.code}"
+
+
+def call(base_url, name, args=(), kwargs=None, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES):
+    data = json.dumps({"args": list(args), "kwargs": kwargs or {}}, default=json_default).encode("utf-8")
+    url = f"{base_url.rstrip('/')}/{name}"
+    for attempt in range(retries + 1):
+        request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return json.loads(response.read())["result"]
+        except urllib.error.HTTPError as e:
+            if e.code == 503 and attempt < retries:
+                time.sleep(float(e.headers.get("Retry-After", 1)))
+                continue
+            message = _error_message(e)
+            if e.code == 500 and name in ERROR_RESULTS:
+                print(f"{name} failed in handler_daemon: {message}", file=sys.stderr)
+                return ERROR_RESULTS[name](message)
+            raise RuntimeError(f"{name} failed in handler_daemon: {message}") from None
+
+
+class HandlerProxy:
+    def __init__(self, module, base_url):
+        self._module = module
+        self._base_url = base_url
+        self._warned = False
+
+    def __getattr__(self, attribute):
+        return getattr(self._module, attribute)
+
+    def handler(self, *args, **kwargs):
+        try:
+            return call(self._base_url, self._module.__name__, args, kwargs)
+        except (OSError, http.client.HTTPException) as e:  # daemon not running, timed out or went away
+            if not self._warned:
+                print(f"handler_daemon unreachable at {self._base_url} ({getattr(e, 'reason', e)}), "
+                      f"running {self._module.__name__} locally", file=sys.stderr)
+                self._warned = True
+            return self._module.handler(*args, **kwargs)
+
+
+def proxy(module):
+    base_url = os.environ.get(DAEMON_URL_ENV)
+    if not base_url or module.__name__ not in HANDLERS:
+        return module
+    return HandlerProxy(module, base_url)
@@ -0,0 +1,199 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+# python version 3.11
+
+# Per-stage spans for the collectors: wall time, CPU time, rows processed and the
+# tracemalloc peak (bytes allocated above the level at span start), plus the error if
+# the stage raised - handlers swallow exceptions, the span still records which stage failed.
+#
+#   with instrumentation.span("top_k_clusters2.vectorize") as stage:
+#       matrix, names = do_tfidf(documents)
+#       stage.set(rows=matrix.shape[0])
+#
+# Off unless SFS_TRACE=1 (or one of the output variables below) is set, or enable() is called.
+# Disabled, span() hands back one shared no-op object, so a stage costs a function call.
+# SFS_TRACE_JSON=path / SFS_TRACE_CHROME=path write the spans when the process exits; the
+# Chrome trace opens in chrome://tracing or https://ui.perfetto.dev.
+# Memory peaks come from tracemalloc, which slows allocation-heavy stages (vectorizing) several
+# times over; SFS_TRACE_MEMORY=0 records timings only, at no measurable cost.
+
+TRACE_ENV = "SFS_TRACE"
+JSON_OUTPUT_ENV = "SFS_TRACE_JSON"
+CHROME_OUTPUT_ENV = "SFS_TRACE_CHROME"
+MEMORY_ENV = "SFS_TRACE_MEMORY"
+
+_enabled = False
+_records = []
+_records_lock = threading.Lock()
+_local = threading.local()  # per-thread stack of open spans
+_epoch = time.perf_counter()
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = attributes
+        self._peak = 0
+        self._start_memory = None
+
+    def set(self, **attributes):
+        # e.g. rows once they are known
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        stack = _stack()
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            # the peak is about to be reset for this span; keep it for the spans already open
+            for open_span in stack:
+                open_span._peak = max(open_span._peak, peak)
+            tracemalloc.reset_peak()
+            self._start_memory = self._peak = current
+        stack.append(self)
+        self._start_cpu = time.process_time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        wall_seconds = time.perf_counter() - self._start
+        cpu_seconds = time.process_time() - self._start_cpu
+        stack = _stack()
+        stack.pop()
+        record = {
+            "name": self.name,
+            "start_seconds": round(self._start - _epoch, 6),
+            "wall_seconds": round(wall_seconds, 6),
+            "cpu_seconds": round(cpu_seconds, 6),
+            "thread": threading.get_ident(),
+            "pid": os.getpid(),
+            "depth": len(stack),
+            **self.attributes,
+        }
+        if self._start_memory is not None and tracemalloc.is_tracing():
+            self._peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+            if stack:
+                stack[-1]._peak = max(stack[-1]._peak, self._peak)
+            record["peak_bytes"] = self._peak - self._start_memory
+        if exc is not None:
+            record["error"] = f"{exc_type.__name__}: {exc}"
+        with _records_lock:
+            _records.append(record)
+        return False
+
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def span(name, **attributes):
+    if not _enabled:
+        return _NOOP_SPAN
+    return Span(name, attributes)
+
+
+def traced(name):
+    # Decorator: the whole call as one span
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with Span(name, {}):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def enable(trace_memory=True):
+    # tracemalloc makes allocations noticeably slower, so it can be left off for timing-only runs
+    global _enabled
+    _enabled = True
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def is_enabled():
+    return _enabled
+
+
+def records():
+    with _records_lock:
+        return list(_records)
+
+
+def reset():
+    with _records_lock:
+        _records.clear()
+
+
+def export_json(path):
+    with open(path, "w", encoding="utf-8") as output_file:
+        json.dump({"spans": records()}, output_file, indent=2, default=str)
+    return path
+
+
+def chrome_trace():
+    # Trace Event Format: complete ("X") events in microseconds
+    events = []
+    for record in records():
+        args = {key: value for key, value in record.items()
+                if key not in ("name", "start_seconds", "wall_seconds", "pid", "thread", "depth")}
+        events.append({
+            "name": record["name"],
+            "ph": "X",
+            "ts": record["start_seconds"] * 1e6,
+            "dur": record["wall_seconds"] * 1e6,
+            "pid": record["pid"],
+            "tid": record["thread"],
+            "args": args,
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def export_chrome_trace(path):
+    with open(path, "w", encoding="utf-8") as output_file:
+        json.dump(chrome_trace(), output_file, default=str)
+    return path
+
+
+def _export_at_exit():
+    if os.environ.get(JSON_OUTPUT_ENV):
+        export_json(os.environ[JSON_OUTPUT_ENV])
+    if os.environ.get(CHROME_OUTPUT_ENV):
+        export_chrome_trace(os.environ[CHROME_OUTPUT_ENV])
+
+
+if os.environ.get(TRACE_ENV, "0") not in ("", "0") or os.environ.get(JSON_OUTPUT_ENV) or os.environ.get(CHROME_OUTPUT_ENV):
+    enable(trace_memory=os.environ.get(MEMORY_ENV, "1") != "0")
+    atexit.register(_export_at_exit)
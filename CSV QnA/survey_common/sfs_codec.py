@@ -0,0 +1,232 @@
+import base64
+import binascii
+import codecs
+import csv
+import io
+# python version 3.11
+
+# Shared SFS ("name" + base64 "content") decoding for the Sentiment and Top-K collectors.
+# The content is decoded in fixed-size slices so that handlers never hold the whole
+# decoded CSV as one Python string; rows and DataFrame chunks are produced lazily.
+#
+# Besides CSV text the content can carry Arrow IPC (file or stream) or Parquet bytes.
+# The payload type is recognised from its magic bytes, so every reader below accepts all
+# three. Binary payloads skip CSV parsing and type inference, and only the requested
+# columns are materialised (Arrow columns are sliced from the decoded buffer without copying,
+# Parquet only reads the requested column chunks). pyarrow is only needed for those payloads.
+
+DECODE_CHUNK_CHARS = 4 * 256 * 1024  # base64 characters per slice (decodes to 768 KiB)
+DEFAULT_DF_CHUNKSIZE = 50_000  # rows per DataFrame chunk
+
+CSV = "csv"
+ARROW = "arrow"  # Arrow IPC file format (.arrow / .feather v2)
+ARROW_STREAM = "arrow_stream"  # Arrow IPC streaming format
+PARQUET = "parquet"
+PAYLOAD_FORMATS = (CSV, ARROW, ARROW_STREAM, PARQUET)
+
+BASE64_ALPHABET = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/="
+NOT_BASE64_BYTES = bytes(set(range(256)).difference(BASE64_ALPHABET))
+
+
+def get_content(sfs_data):
+    # Accept either the SFS envelope or its bare "content" string
+    if isinstance(sfs_data, dict):
+        return sfs_data.get('content')
+    return sfs_data
+
+
+def _base64_alphabet_only(text):
+    # base64.b64decode (without validate) skips every character outside the alphabet;
+    # like it, refuse text that isn't ASCII
+    return text.encode('ascii').translate(None, NOT_BASE64_BYTES)
+
+
+def iter_base64_bytes(content, chunk_chars=DECODE_CHUNK_CHARS):
+    # Decode base64 text incrementally, giving the same bytes base64.b64decode(content) does.
+    # A partial 4-character group is carried over to the next slice.
+    carry = b""
+    for start in range(0, len(content), chunk_chars):
+        piece = carry + _base64_alphabet_only(content[start:start + chunk_chars])
+        if b"=" in piece:
+            # b64decode stops at the padding, wherever it is; decode the little that is normally
+            # left after it in one go, so odd padding is handled exactly as b64decode does
+            yield base64.b64decode(piece + _base64_alphabet_only(content[start + chunk_chars:]))
+            return
+        usable = len(piece) - len(piece) % 4
+        carry = piece[usable:]
+        if usable:
+            yield base64.b64decode(piece[:usable])
+    if carry:
+        raise binascii.Error("Incorrect padding")
+
+
+def is_base64_content(content, chunk_chars=DECODE_CHUNK_CHARS):
+    # The old handlers decoded the whole content and fell back to treating it as plain CSV
+    # when it was not base64 UTF-8. Run the same checks over every slice up front, keeping
+    # none of the decoded bytes, so the fallback still applies when only a late slice is bad.
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        for chunk in iter_base64_bytes(content, chunk_chars):
+            decoder.decode(chunk)
+        decoder.decode(b"", final=True)
+    except (binascii.Error, ValueError):  # UnicodeError is a ValueError
+        return False
+    return True
+
+
+class Base64Stream(io.RawIOBase):
+    """Read-only binary stream over base64 text that decodes on demand."""
+
+    def __init__(self, content, chunk_chars=DECODE_CHUNK_CHARS):
+        self._chunks = iter_base64_bytes(content, chunk_chars)
+        self._buffer = memoryview(b"")
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        while not self._buffer:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._buffer = memoryview(chunk)
+        size = min(len(target), len(self._buffer))
+        target[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+def open_text(sfs_data, encoding='utf-8'):
+    # Text stream over the decoded CSV; never materialises the whole file
+    content = get_content(sfs_data)
+    if not is_base64_content(content):
+        return io.StringIO(content, newline='')
+    raw = io.BufferedReader(Base64Stream(content), buffer_size=io.DEFAULT_BUFFER_SIZE * 16)
+    return io.TextIOWrapper(raw, encoding=encoding, newline='')
+
+
+def payload_format(sfs_data):
+    # Magic bytes at the start of the decoded content; anything else is CSV text
+    content = get_content(sfs_data)
+    try:
+        magic = base64.b64decode(_base64_alphabet_only(content[:64])[:12])
+    except (binascii.Error, ValueError):
+        return CSV
+    if magic.startswith(b"ARROW1"):
+        return ARROW
+    if magic.startswith(b"\xff\xff\xff\xff"):  # continuation marker of the first stream message
+        return ARROW_STREAM
+    if magic.startswith(b"PAR1"):
+        return PARQUET
+    return CSV
+
+
+def _selected_columns(names, usecols):
+    # usecols as pandas takes it (names or positions); columns come back in file order
+    if usecols is None:
+        return list(names)
+    wanted = {names[column] if isinstance(column, int) else column for column in usecols}
+    missing = wanted.difference(names)
+    if missing:
+        raise ValueError(f"Usecols do not match columns, columns expected but not found: {sorted(missing)}")
+    return [name for name in names if name in wanted]
+
+
+def read_table(sfs_data, usecols=None):
+    # pyarrow.Table for a binary payload, restricted to usecols
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    content = get_content(sfs_data)
+    buffer = pa.py_buffer(base64.b64decode(content))
+    fmt = payload_format(content)
+    if fmt == PARQUET:
+        parquet_file = pq.ParquetFile(pa.BufferReader(buffer))
+        return parquet_file.read(columns=_selected_columns(parquet_file.schema_arrow.names, usecols))
+    if fmt == ARROW:
+        table = pa.ipc.open_file(buffer).read_all()
+    elif fmt == ARROW_STREAM:
+        table = pa.ipc.open_stream(buffer).read_all()
+    else:
+        raise ValueError(f"Not a binary SFS payload: {fmt}")
+    return table.select(_selected_columns(table.column_names, usecols))
+
+
+def _table_to_df(table, dtype=None):
+    df = table.to_pandas()
+    return df.astype(dtype) if dtype else df
+
+
+def iter_csv_rows(sfs_data):
+    if payload_format(sfs_data) != CSV:
+        # Same shape csv.reader gives: header, then every field as text ("" for missing)
+        df = read_df(sfs_data)
+        yield [str(column) for column in df.columns]
+        for row in df.astype(object).where(df.notna(), "").itertuples(index=False, name=None):
+            yield [str(value) for value in row]
+        return
+    with open_text(sfs_data) as text_stream:
+        yield from csv.reader(text_stream)
+
+
+def iter_dict_rows(sfs_data):
+    if payload_format(sfs_data) != CSV:
+        rows = iter_csv_rows(sfs_data)
+        header = next(rows)
+        for row in rows:
+            yield dict(zip(header, row))
+        return
+    with open_text(sfs_data) as text_stream:
+        yield from csv.DictReader(text_stream)
+
+
+def iter_df_chunks(sfs_data, chunksize=DEFAULT_DF_CHUNKSIZE, **read_csv_kwargs):
+    import pandas as pd
+    if payload_format(sfs_data) != CSV:
+        table = read_table(sfs_data, read_csv_kwargs.get("usecols"))
+        for start in range(0, table.num_rows, chunksize):
+            yield _table_to_df(table.slice(start, chunksize), read_csv_kwargs.get("dtype"))
+        return
+    with open_text(sfs_data) as text_stream:
+        with pd.read_csv(text_stream, chunksize=chunksize, **read_csv_kwargs) as reader:
+            yield from reader
+
+
+def read_df(sfs_data, **read_csv_kwargs):
+    # pandas pulls from the stream in blocks, so peak memory is the DataFrame itself.
+    # For binary payloads only usecols and dtype of read_csv_kwargs apply.
+    import pandas as pd
+    if payload_format(sfs_data) != CSV:
+        return _table_to_df(read_table(sfs_data, read_csv_kwargs.get("usecols")), read_csv_kwargs.get("dtype"))
+    with open_text(sfs_data) as text_stream:
+        return pd.read_csv(text_stream, **read_csv_kwargs)
+
+
+def read_column(sfs_data, position):
+    # One column by position (e.g. 1 for the answer text) without materialising the others
+    return read_df(sfs_data, usecols=[position]).iloc[:, 0]
+
+
+def df_to_sfs(df, name, payload=CSV):
+    # Build the SFS envelope for a DataFrame; only needed where data leaves the process
+    if payload == CSV:
+        data = df.to_csv(index=False).encode('utf-8')
+    else:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        if payload == PARQUET:
+            pq.write_table(table, sink)
+        elif payload == ARROW:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        elif payload == ARROW_STREAM:
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+        else:
+            raise ValueError(f"Unknown SFS payload {payload!r}, expected one of {PAYLOAD_FORMATS}")
+        data = sink.getvalue()
+    return {
+        "name": name,
+        "content": base64.b64encode(data).decode('utf-8')
+    }
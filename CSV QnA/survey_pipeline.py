@@ -0,0 +1,85 @@
+import argparse
+import survey_common
+from survey_common import encoding_sniffer
+from survey_common import sfs_codec
+survey_common.add_script_dirs(*survey_common.COLLECTORS)
+import calculate_percentage
+import make_sentiment_column2 as msc
+import sentiment_cache
+import top_k_clusters2 as tkc  # tf-idf, as in top_k_phrases_main
+import top_k_formatter as tkf
+# python version 3.11
+
+# Runs the sentiment and top-K collectors on one survey from a single parse of the CSV.
+# sentiment_counter_main and top_k_phrases_main each read the CSV, re-serialise it into an
+# SFS envelope and have their handler decode and parse it again (four parses for one
+# survey). Here the file is read once into a DataFrame and both stages take their column
+# straight from it; an SFS envelope is only built when a caller asks for one (to_sfs).
+
+
+def load_survey(csv_file_path):
+    # Encoding detected from a sample, then a single decode + parse
+    import pandas as pd
+    with encoding_sniffer.open_text(csv_file_path) as csv_file:
+        return pd.read_csv(csv_file)
+
+
+def sentiment_stage(df, cache_path=sentiment_cache.SENTIMENT_CACHE_PATH):
+    # Adds a lower-case "sentiment" column (what calculate_sentiment counts) and returns the summary
+    answers = df.iloc[:, 1]  # use col 2
+    if cache_path is None:
+        labels = msc.get_sentiments(answers)
+    else:
+        with sentiment_cache.SentimentCache(cache_path) as cache:
+            labels = msc.get_sentiments(answers, cache=cache)
+    if isinstance(labels, str):  # get_sentiments reports failures as a message
+        raise RuntimeError(labels)
+    df["sentiment"] = [label.lower() for label in labels]
+    return calculate_percentage.calculate_sentiment(df)
+
+
+def top_k_stage(df, K=5):
+    documents = df.iloc[:, 1]  # use col 2
+    tfidf_matrix, feature_names = tkc.do_tfidf(documents, 1, 3)
+    phrase_percentage_pairs = tkc.calc_percentages(len(documents), tfidf_matrix, feature_names)
+    return tkc.get_top_K(K, phrase_percentage_pairs)
+
+
+def to_sfs(df, name='data_with_sentiments.csv', payload=sfs_codec.CSV):
+    # payload: sfs_codec.CSV, ARROW, ARROW_STREAM or PARQUET; every handler reads all of them
+    return sfs_codec.df_to_sfs(df, name, payload)
+
+
+def run(csv_file_path, K=5, sentiment=True, top_k=True, cache_path=sentiment_cache.SENTIMENT_CACHE_PATH):
+    df = load_survey(csv_file_path)
+    results = {"total_rows": len(df)}
+    if top_k:
+        # before the sentiment stage adds its column; only col 2 is read either way
+        results["top_k"] = top_k_stage(df, K)
+        results["top_k_report"] = tkf.handler(results["top_k"])
+    if sentiment:
+        results["sentiment"] = sentiment_stage(df, cache_path)
+    results["data"] = df
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentiment summary and top-K phrases from one read of a survey CSV.")
+    parser.add_argument("csv_file")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--no-sentiment", action="store_true")
+    parser.add_argument("--no-top-k", action="store_true")
+    parser.add_argument("--no-cache", action="store_true", help="don't use the sentiment cache")
+    args = parser.parse_args()
+
+    print(f"Processing CSV file: {args.csv_file}")
+    results = run(args.csv_file, args.k, sentiment=not args.no_sentiment, top_k=not args.no_top_k,
+                  cache_path=None if args.no_cache else sentiment_cache.SENTIMENT_CACHE_PATH)
+    if "sentiment" in results:
+        print(results["sentiment"])
+    if "top_k_report" in results:
+        print(results["top_k_report"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # "CSV QnA", for survey_common
+import survey_common
+# python version 3.11
+
+# The tests import the scripts' modules by bare name, as the scripts do
+survey_common.add_script_dirs(*survey_common.COLLECTORS, survey_common.COLUMN_CONCATENATOR, survey_common.ROW_COUNTER)
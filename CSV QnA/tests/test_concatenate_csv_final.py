@@ -0,0 +1,83 @@
+import csv
+import filecmp
+import random
+import pytest
+import concatenate_csv_final
+# python version 3.11
+
+# The parallel concatenator must write exactly what the serial one writes. Small chunks force
+# many splits, so split points land next to quoted multi-line answers, escaped quotes and
+# stray quotes inside unquoted fields (1,My 5" screen,fine), which csv.reader keeps as text.
+
+ENCODINGS = ['utf-8', 'utf-8-sig', 'cp1252', 'utf-16', 'utf-32']
+
+
+def write_survey(path, rows, encoding):
+    with open(path, 'w', encoding=encoding, newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ID', 'What went well?', 'What could be better?', 'Anything else?'])
+        for row in range(1, rows):
+            writer.writerow([
+                row,
+                f"The café session ’{row}’ was great",
+                f"More time\nfor \"hands-on\" work, row {row}" if row % 7 == 0 else '',
+                'N/A' if row % 5 == 0 else f"answer {row}",
+            ])
+
+
+def write_stray_quote_survey(path, rows, seed, line_ending='\n'):
+    # Written by hand: csv.writer would quote every field that contains a '"'
+    rng = random.Random(seed)
+    fields = ['fine', 'My 5" screen', '2"x4" boards', 'a "quoted" word', '"multi\nline, with ""escaped"" quotes"',
+              '"plain quoted"', '', '"ends with a quote"""', 'trailing"']
+    lines = ['ID,Answer,Comment']
+    for row in range(1, rows):
+        lines.append(f"{row},{rng.choice(fields)},{rng.choice(fields)}")
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(line_ending.join(lines) + line_ending)
+
+
+def assert_parallel_matches_serial(tmp_path, input_file, chunk_bytes):
+    serial_output = tmp_path / "serial.csv"
+    parallel_output = tmp_path / "parallel.csv"
+    serial_rows = concatenate_csv_final.concatenate_csv_columns_streaming(input_file, serial_output)
+    parallel_rows = concatenate_csv_final.concatenate_csv_columns_parallel(
+        input_file, parallel_output, workers=2, chunk_bytes=chunk_bytes)
+    assert parallel_rows == serial_rows
+    assert filecmp.cmp(serial_output, parallel_output, shallow=False)
+    return serial_rows
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_parallel_matches_serial_for_every_encoding(tmp_path, encoding):
+    input_file = tmp_path / "survey.csv"
+    write_survey(input_file, 2001, encoding)
+    assert assert_parallel_matches_serial(tmp_path, input_file, chunk_bytes=4096) == 2001
+
+
+@pytest.mark.parametrize("line_ending", ['\n', '\r\n'])
+@pytest.mark.parametrize("chunk_bytes", [97, 500, 4096])
+def test_parallel_matches_serial_with_stray_quotes(tmp_path, monkeypatch, line_ending, chunk_bytes):
+    # tiny scan blocks so quotes, escaped pairs and CRLFs also straddle block boundaries
+    monkeypatch.setattr(concatenate_csv_final, "SCAN_BLOCK_BYTES", 61)
+    input_file = tmp_path / "survey.csv"
+    write_stray_quote_survey(input_file, 400, seed=chunk_bytes, line_ending=line_ending)
+    with open(input_file, encoding='utf-8', newline='') as f:
+        expected_rows = sum(1 for _ in csv.reader(f))
+    assert assert_parallel_matches_serial(tmp_path, input_file, chunk_bytes) == expected_rows
+
+
+def test_boundaries_start_records(tmp_path, monkeypatch):
+    monkeypatch.setattr(concatenate_csv_final, "SCAN_BLOCK_BYTES", 61)
+    input_file = tmp_path / "survey.csv"
+    write_stray_quote_survey(input_file, 400, seed=1)
+    data = input_file.read_bytes()
+    with open(input_file, encoding='utf-8', newline='') as f:
+        record_starts = {0}
+        reader = csv.reader(f)
+        for _ in reader:
+            record_starts.add(len('\n'.join(data.decode('utf-8').split('\n')[:reader.line_num]).encode('utf-8')) + 1)
+    boundaries = concatenate_csv_final.find_record_boundaries(input_file, chunk_bytes=200)
+    assert len(boundaries) > 10
+    assert set(boundaries[:-1]) <= record_starts
+    assert boundaries[-1] == len(data)
@@ -0,0 +1,39 @@
+import csv
+import pytest
+import count_records
+# python version 3.11
+
+# scan_records must count the records csv.reader reads, however the blocks fall. Every input
+# is scanned with blocks small enough to cut through quotes, "" pairs and CRLFs.
+
+INPUTS = {
+    'stray quote': b'ID,A\n1,5" screen\n2,ok\n3,"multi\nline"\n4,x\n',
+    'stray quotes everywhere': b'ID,A,B\n1,2"x4" boards,"said ""hi""\nthen left"\n2,trailing",a "b" c\n3,"",""""\n',
+    'crlf': b'ID,A\r\n1,"two\r\nlines"\r\n2,My 5" screen\r\n3,ok\r\n',
+    'no trailing newline': b'ID,A\n1,"multi\nline"\n2,5" screen',
+    'quoted last field, no trailing newline': b'ID,A\n1,ok\n2,"multi\nline"',
+    'blank lines': b'ID,A\n\n1,ok\n\n\n2,"a\n\nb"\n\n',
+    'multi-line header': b'ID,"What went\nwell?"\n1,ok\n2,fine\n',
+    'header only': b'ID,A',
+}
+
+
+@pytest.mark.parametrize("block_bytes", [1, 3, 7, 1024])
+@pytest.mark.parametrize("name", INPUTS)
+def test_scan_records_matches_csv_reader(tmp_path, name, block_bytes):
+    data = INPUTS[name]
+    path = tmp_path / "survey.csv"
+    path.write_bytes(data)
+    with open(path, encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        rows = [reader.line_num for _ in reader]
+    scan = count_records.scan_records(path, block_bytes=block_bytes)
+    assert scan["records"] == len(rows)
+    assert scan["header_lines"] == rows[0]
+    assert scan["physical_lines"] == len(data.splitlines())
+
+
+def test_count_non_header_records_with_stray_quote(tmp_path):
+    path = tmp_path / "survey.csv"
+    path.write_bytes(INPUTS['stray quote'])
+    assert count_records.count_non_header_records(path) == 4
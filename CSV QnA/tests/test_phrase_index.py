@@ -0,0 +1,44 @@
+import phrase_index
+# python version 3.11
+
+# Surveys are re-exported as they grow and every export is ingested; rows already counted
+# must not be counted again, however pandas would have typed the ID column.
+
+HEADER = "ID,What went well?\n"
+TOPICS = ["session", "demos", "labs", "speakers", "venue"]
+ROWS = "".join(f"{row},hands on {TOPICS[row % 5]} {'were great' if row % 3 else 'too short'}\n" for row in range(1, 41))
+
+
+def write_export(tmp_path, name, rows):
+    path = tmp_path / name
+    path.write_text(HEADER + rows, encoding="utf-8")
+    return phrase_index.read_survey_csv(path)
+
+
+def test_same_export_ingested_twice(tmp_path):
+    df = write_export(tmp_path, "export.csv", ROWS)
+    with phrase_index.PhraseIndex(str(tmp_path / "index.sqlite3")) as index:
+        assert index.ingest("survey", df) == 40
+        top_k = index.top_k("survey")
+        assert index.ingest("survey", df) == 0
+        assert index.total_docs("survey") == 40
+        assert index.top_k("survey") == top_k
+        assert index.verify("survey", df)["match"]
+
+
+def test_blank_id_neither_recounts_nor_fails(tmp_path):
+    # One blank ID makes pandas read the ID column as floats ("1.0"), which used to look new
+    first = write_export(tmp_path, "export1.csv", ROWS)
+    second = write_export(tmp_path, "export2.csv", ROWS + ",hands on labs were great\n41,venue too short\n")
+    assert second.iloc[:, 0].tolist()[-3:] == ["40", "", "41"]
+    with phrase_index.PhraseIndex(str(tmp_path / "index.sqlite3")) as index:
+        index.ingest("survey", first)
+        assert index.ingest("survey", second) == 1  # only ID 41
+        assert index.total_docs("survey") == 41
+        assert index.verify("survey", second)["match"]
+
+
+def test_row_ids_from_a_float_column():
+    import pandas as pd
+    df = pd.DataFrame({"ID": [1.0, None, 2.5], "answer": ["a", "b", "c"]})
+    assert list(phrase_index.row_ids(df)) == ["1", "", "2.5"]
@@ -1,3 +1,15 @@
+import argparse
+import csv
+import functools
+import hashlib
+import os
+import re
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit, urlunsplit
+import numpy as np
 import qrcode
 from PIL import Image, ImageDraw, ImageFont
 
@@ -9,44 +21,172 @@ PATH_TO_QRCODE = "qrcode.png"
 PATH_TO_CARD = "card.png"
 PATH_TO_CARD_QR = "card_qr.png"
 PATH_TO_CARD_QR_TEXT = "card_qr_text.png"
+PATH_TO_TEMPLATE = "Simple Corporate Business Card.png"
+PATH_TO_BATCH_OUTPUT = "cards"
+BATCH_PNG_COMPRESS_LEVEL = 1  # still lossless; zlib level 1 encodes ~40% faster than PIL's default 6
 # __________________________________________ EDIT QR-CODE DETAILS HERE __________________________________________
 QR_SIZE = (260, 260)  # keep aspect ratio by ensuring dimension is same?
 QR_MARGIN = 20
+QR_FILL = (255, 255, 255, 255)  # white modules...
+QR_BACK = (0, 0, 0, 0)  # ...on a transparent background, for dark card templates
+QR_RENDERER = "matrix"  # "matrix": modules scaled by a whole number of pixels; "resize": old box_size=10 + LANCZOS
+QR_ERROR_CORRECTION = qrcode.constants.ERROR_CORRECT_L
+QR_CACHE_MAX_BYTES = 64 * 1024 * 1024  # rendered QR images kept in memory (a 260x260 RGBA image is ~264 KB)
 # __________________________________________ EDIT TEXT DETAILS HERE __________________________________________
 RGB_WHITE = (255, 255, 255)
+# "column" is the roster CSV column used in batch mode, where a blank cell leaves the field blank;
+# "text" is used for the single card.
+# Add "font": "path/to/font.ttf" to a field to use a TrueType font instead of Pillow's default.
 TEXT_FIELDS = [
-    { "text": "PLACEHOLDER",
+    { "text": "PLACEHOLDER", "column": "name",
         "size": 40, "color": RGB_WHITE, "right_edge": 995, "vert_pos": 55 },
-    { "text": "PlaceHolder",
+    { "text": "PlaceHolder", "column": "title",
         "size": 30, "color": RGB_WHITE, "right_edge": 995, "vert_pos": 110 },
-    { "text": "+65 90123478",
+    { "text": "+65 90123478", "column": "phone",
         "size": 20, "color": RGB_WHITE, "right_edge": 925, "vert_pos": 190 },
-    { "text": "placeholder@email.com",
+    { "text": "placeholder@email.com", "column": "email",
         "size": 20, "color": RGB_WHITE, "right_edge": 925, "vert_pos": 260 }
 ]
+ROSTER_URL_COLUMN = "url"  # optional per-person QR target; URL_OF_QRCODE otherwise
 
 
 # __________________________________________ HELPER FUNCTIONS __________________________________________
-def generate_qrcode(raw_url=URL_DEFAULT, output_path_qrcode=PATH_TO_QRCODE):
+def normalize_qr_url(raw_url):
     # clean & validate input
-    clean_url = raw_url.strip()
-    if not isinstance(clean_url, str):
+    if not isinstance(raw_url, str):
         raise ValueError("Input must be a string (URL).")
+    clean_url = raw_url.strip()
     if not clean_url.startswith("https://"):
         clean_url = "https://" + clean_url
+    # scheme and host are case-insensitive; path and query are kept as given
+    parts = urlsplit(clean_url)
+    return urlunsplit(parts._replace(scheme=parts.scheme.lower(), netloc=parts.netloc.lower()))
+def make_qrcode(raw_url=URL_DEFAULT, error_correction=QR_ERROR_CORRECTION):
+    clean_url = normalize_qr_url(raw_url)
     # make qr
     qr_code = qrcode.QRCode(
         version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        error_correction=error_correction,
         box_size=10,
         border=4,
     )
     qr_code.add_data(clean_url)
     qr_code.make(fit=True)
-    qr_img = qr_code.make_image(fill_color="white", back_color="transparent")
-    resized_qr_img = qr_img.resize(QR_SIZE, Image.Resampling.LANCZOS)
-    resized_qr_img.save(output_path_qrcode)
+    return qr_code
+def qr_matrix(raw_url=URL_DEFAULT, error_correction=QR_ERROR_CORRECTION):
+    # modules (True = filled) including the 4-module quiet zone
+    return np.array(make_qrcode(raw_url, error_correction).get_matrix(), dtype=bool)
+def render_qr_matrix(matrix, size=QR_SIZE, fill=QR_FILL, back=QR_BACK):
+    # Every module becomes an exact scale x scale block, so edges stay sharp; the leftover
+    # pixels (less than one module per side) are padded with the background, centred
+    rows, columns = matrix.shape
+    scale = min(size[0] // columns, size[1] // rows)
+    if scale < 1:
+        raise ValueError(f"QR_SIZE {size} is smaller than the {columns}-module code")
+    palette = np.array([back, fill], dtype=np.uint8).view(np.uint32).ravel()  # one RGBA pixel per entry
+    modules = palette[matrix.view(np.uint8)]
+    blocks = np.broadcast_to(modules[:, None, :, None], (rows, scale, columns, scale)).reshape(rows * scale, columns * scale)
+    pixels = np.full((size[1], size[0]), palette[0], dtype=np.uint32)
+    top = (size[1] - rows * scale) // 2
+    left = (size[0] - columns * scale) // 2
+    pixels[top:top + rows * scale, left:left + columns * scale] = blocks
+    return Image.fromarray(pixels.view(np.uint8).reshape(size[1], size[0], 4), "RGBA")
+def make_qrcode_image(raw_url=URL_DEFAULT, renderer=QR_RENDERER, error_correction=QR_ERROR_CORRECTION,
+                      size=QR_SIZE, fill=QR_FILL, back=QR_BACK):
+    if renderer == "matrix":
+        return render_qr_matrix(qr_matrix(raw_url, error_correction), size, fill, back)
+    back_color = "transparent" if back[3] == 0 else back[:3]
+    qr_img = make_qrcode(raw_url, error_correction).make_image(fill_color=fill[:3], back_color=back_color)
+    return qr_img.resize(size, Image.Resampling.LANCZOS).convert("RGBA")
+class QRCache:
+    # Rendered QR images keyed by (normalized URL, error correction, size, colors, renderer).
+    # Least recently used images are dropped once the cached pixels exceed max_bytes. With disk_dir
+    # set, images are also kept as PNGs there, shared across runs and worker processes.
+    # Cached images are shared between callers, so treat them as read-only (paste, don't draw on them).
+    def __init__(self, max_bytes=QR_CACHE_MAX_BYTES, disk_dir=None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get(self, raw_url, renderer=QR_RENDERER, error_correction=QR_ERROR_CORRECTION,
+            size=QR_SIZE, fill=QR_FILL, back=QR_BACK):
+        key = (normalize_qr_url(raw_url), error_correction, tuple(size), tuple(fill), tuple(back), renderer)
+        qr_img = self._images.get(key)
+        if qr_img is not None:
+            self._images.move_to_end(key)
+            self.hits += 1
+            return qr_img
+        disk_path = self._disk_path(key)
+        if disk_path and os.path.exists(disk_path):
+            with Image.open(disk_path) as stored:
+                qr_img = stored.convert("RGBA")
+            self.disk_hits += 1
+        else:
+            qr_img = make_qrcode_image(key[0], renderer, error_correction, size, fill, back)
+            self.misses += 1
+            if disk_path:
+                self._save(qr_img, disk_path)
+        self._add(key, qr_img)
+        return qr_img
+
+    def _disk_path(self, key):
+        if not self.disk_dir:
+            return None
+        return os.path.join(self.disk_dir, hashlib.sha256(repr(key).encode("utf-8")).hexdigest() + ".png")
+
+    def _save(self, qr_img, disk_path):
+        # write-then-rename, so a worker never reads a half-written file
+        fd, tmp_path = tempfile.mkstemp(suffix=".png", dir=self.disk_dir)
+        with os.fdopen(fd, "wb") as tmp_file:
+            qr_img.save(tmp_file, "PNG")
+        os.replace(tmp_path, disk_path)
+
+    def _add(self, key, qr_img):
+        self._images[key] = qr_img
+        self.bytes += qr_img.width * qr_img.height * 4
+        while self.bytes > self.max_bytes and len(self._images) > 1:
+            _, evicted = self._images.popitem(last=False)
+            self.bytes -= evicted.width * evicted.height * 4
+
+    def stats(self):
+        return {"entries": len(self._images), "bytes": self.bytes,
+                "hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses}
+def qr_svg(matrix, size=QR_SIZE, fill=QR_FILL, back=QR_BACK):
+    # Vector QR for print: one path, a horizontal run of filled modules per subpath
+    def css_color(rgba):
+        return f"rgb({rgba[0]},{rgba[1]},{rgba[2]})", rgba[3] / 255
+    fill_color, fill_opacity = css_color(fill)
+    back_color, back_opacity = css_color(back)
+    runs = []
+    for y, row in enumerate(matrix):
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], row.astype(np.int8), [0]))))
+        runs.extend(f"M{start} {y}h{end - start}v1h-{end - start}z" for start, end in zip(edges[::2], edges[1::2]))
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size[0]}" height="{size[1]}" '
+        f'viewBox="0 0 {matrix.shape[1]} {matrix.shape[0]}" shape-rendering="crispEdges">'
+        f'<rect width="100%" height="100%" fill="{back_color}" fill-opacity="{back_opacity:g}"/>'
+        f'<path d="{"".join(runs)}" fill="{fill_color}" fill-opacity="{fill_opacity:g}"/></svg>'
+    )
+def generate_qrcode(raw_url=URL_DEFAULT, output_path_qrcode=PATH_TO_QRCODE):
+    # .svg paths get the vector version
+    if output_path_qrcode.lower().endswith(".svg"):
+        with open(output_path_qrcode, "w", encoding="utf-8") as svg_file:
+            svg_file.write(qr_svg(qr_matrix(raw_url)))
+        return output_path_qrcode
+    make_qrcode_image(raw_url).save(output_path_qrcode)
     return output_path_qrcode
+def paste_qrcode(card_img, qr_img):
+    # overlay qr onto card (in place), bottom-right corner
+    pos_x = card_img.width - qr_img.width - QR_MARGIN
+    pos_y = card_img.height - qr_img.height - QR_MARGIN
+    card_img.paste(qr_img, (pos_x, pos_y), qr_img)  # Use QR as mask for transparency
+    return card_img
 def add_qrcode_to_card(qr_filename=PATH_TO_QRCODE, card_filename=PATH_TO_CARD, output_path_card_with_qr=PATH_TO_CARD_QR):
     # get file
     try:
@@ -54,48 +194,133 @@ def add_qrcode_to_card(qr_filename=PATH_TO_QRCODE, card_filename=PATH_TO_CARD, o
         qr_img = Image.open(qr_filename).convert("RGBA")
     except Exception as e:
         raise FileNotFoundError(f"Could not load one of the images: {e}")
-    # overlay qr onto card
-    pos_x = card_img.width - qr_img.width - QR_MARGIN
-    pos_y = card_img.height - qr_img.height - QR_MARGIN
-    card_img.paste(qr_img, (pos_x, pos_y), qr_img)  # Use QR as mask for transparency
-    card_img.save(output_path_card_with_qr)
+    paste_qrcode(card_img, qr_img).save(output_path_card_with_qr)
     return output_path_card_with_qr
 
+@functools.lru_cache(maxsize=32)
+def get_font(font_path=None, size=20):
+    # Loaded once per (font path, size) per process; None is Pillow's default font
+    if font_path is None:
+        return ImageFont.load_default(size=size)
+    return ImageFont.truetype(font_path, size)
 def get_horiz_pos(draw, font, right_edge, text):
     bbox = draw.textbbox((0, 0), text, font=font)
     text_width = bbox[2] - bbox[0]  # Right - Left
     horiz_pos = right_edge - text_width
     return horiz_pos  # right-aligned
-def add_text_to_card(card_filename=PATH_TO_CARD_QR, output_path_card_with_qr_and_text=PATH_TO_CARD_QR_TEXT):
-    # get file
-    try:
-        card_img = Image.open(card_filename).convert("RGBA")  # Ensure transparency support
-    except Exception as e:
-        raise FileNotFoundError(f"Could not load one of the images: {e}")
-    # overlay text onto card
+@functools.lru_cache(maxsize=4096)
+def get_text_width(font_path, size, text, fontmode="L"):
+    # Same box draw.textbbox measures; repeated strings (company name, titles) are measured once
+    bbox = get_font(font_path, size).getbbox(text, mode=fontmode)
+    return bbox[2] - bbox[0]  # Right - Left
+def draw_text_fields(card_img, text_fields=TEXT_FIELDS):
+    # overlay text onto card (in place)
     draw = ImageDraw.Draw(card_img)
-    for text_field in TEXT_FIELDS:
+    for text_field in text_fields:
         text = text_field["text"]
         size = text_field["size"]
         color = text_field["color"]
         right_edge = text_field["right_edge"]
         vert_pos = text_field["vert_pos"]
+        font_path = text_field.get("font")
+        if not text:
+            continue
 
-        font = ImageFont.load_default(size=size)  # Use default font at desired size
-        draw.text((get_horiz_pos(draw, font, right_edge, text), vert_pos), text, fill=color, font=font)
-    card_img.save(output_path_card_with_qr_and_text)
+        font = get_font(font_path, size)
+        horiz_pos = right_edge - get_text_width(font_path, size, text, draw.fontmode)  # right-aligned
+        draw.text((horiz_pos, vert_pos), text, fill=color, font=font)
+    return card_img
+def add_text_to_card(card_filename=PATH_TO_CARD_QR, output_path_card_with_qr_and_text=PATH_TO_CARD_QR_TEXT):
+    # get file
+    try:
+        card_img = Image.open(card_filename).convert("RGBA")  # Ensure transparency support
+    except Exception as e:
+        raise FileNotFoundError(f"Could not load one of the images: {e}")
+    draw_text_fields(card_img).save(output_path_card_with_qr_and_text)
     return output_path_card_with_qr_and_text
+# __________________________________________ BATCH MODE __________________________________________
+# One card per roster row. Each worker process loads the template and fonts once (_init_batch_worker);
+# a card is composed entirely in memory and only the finished image is written.
+_batch_template = None
+_batch_output_dir = None
+_batch_compress_level = BATCH_PNG_COMPRESS_LEVEL
+_batch_qr_cache = None  # shared company URL is encoded and rendered once per worker
+
+
+def read_roster(roster_path):
+    # Rows without a name are skipped with a warning rather than made into nameless cards
+    with open(roster_path, newline="", encoding="utf-8-sig") as roster_file:
+        reader = csv.DictReader(roster_file)
+        if "name" not in [key.strip().lower() for key in reader.fieldnames or [] if key]:
+            raise ValueError(f"Roster {roster_path} has no 'name' column")
+        people = []
+        unnamed_lines = []
+        for row in reader:
+            person = {key.strip().lower(): (value or "").strip() for key, value in row.items() if key}
+            if person.get("name"):
+                people.append(person)
+            else:
+                unnamed_lines.append(reader.line_num)
+    if unnamed_lines:
+        shown = ", ".join(map(str, unnamed_lines[:10])) + (", ..." if len(unnamed_lines) > 10 else "")
+        print(f"Skipped {len(unnamed_lines)} roster rows with no name (lines {shown})")
+    return people
+def card_text_fields(person):
+    # Roster fields only ever show the person's own details, never the template placeholders
+    return [dict(text_field, text=person.get(text_field["column"], "")) if "column" in text_field else text_field
+            for text_field in TEXT_FIELDS]
+def card_filename(index, person):
+    slug = re.sub(r"[^a-z0-9]+", "_", person.get("name", "").lower()).strip("_") or "card"
+    return f"{index:05d}_{slug}.png"
+def _init_batch_worker(template_path, output_dir, compress_level=BATCH_PNG_COMPRESS_LEVEL, qr_cache_dir=None):
+    global _batch_template, _batch_output_dir, _batch_compress_level, _batch_qr_cache
+    _batch_template = Image.open(template_path).convert("RGBA")
+    for text_field in TEXT_FIELDS:
+        get_font(text_field.get("font"), text_field["size"])
+    _batch_output_dir = output_dir
+    _batch_compress_level = compress_level
+    _batch_qr_cache = QRCache(disk_dir=qr_cache_dir)
+def _render_card(indexed_person):
+    index, person = indexed_person
+    card_img = _batch_template.copy()
+    paste_qrcode(card_img, _batch_qr_cache.get(person.get(ROSTER_URL_COLUMN) or URL_OF_QRCODE))
+    draw_text_fields(card_img, card_text_fields(person))
+    output_path = os.path.join(_batch_output_dir, card_filename(index, person))
+    card_img.save(output_path, compress_level=_batch_compress_level)
+    return output_path
+def make_cards_from_roster(roster_path, template_path=PATH_TO_TEMPLATE, output_dir=PATH_TO_BATCH_OUTPUT, workers=None,
+                           compress_level=BATCH_PNG_COMPRESS_LEVEL, qr_cache_dir=None):
+    people = read_roster(roster_path)
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    with ProcessPoolExecutor(workers, initializer=_init_batch_worker, initargs=(template_path, output_dir, compress_level, qr_cache_dir)) as pool:
+        output_paths = list(pool.map(_render_card, enumerate(people), chunksize=max(1, len(people) // (workers * 8))))
+    seconds = time.perf_counter() - start
+    print(f"Made {len(output_paths)} cards in {seconds:.2f}s ({len(output_paths) / seconds:.1f} cards/sec, {workers} workers)")
+    return output_paths
 # __________________________________________ MAIN FUNCTION __________________________________________
-def make_card_qr_text():
+def make_card_qr_text(template_path=PATH_TO_TEMPLATE):
     qr = generate_qrcode(
         URL_OF_QRCODE
     )
     card_qr = add_qrcode_to_card(
         qr,
-        "Simple Corporate Business Card.png"
+        template_path
     )
     card_qr_text = add_text_to_card(
         card_qr
     )
     print("Namecard file path is: " + card_qr_text)
-make_card_qr_text()
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Make a QR business card, or one per person in a CSV roster.")
+    parser.add_argument("--roster", help="CSV with name, title, phone, email (and optional url) columns")
+    parser.add_argument("--template", default=PATH_TO_TEMPLATE)
+    parser.add_argument("--out", default=PATH_TO_BATCH_OUTPUT, help="output folder for batch mode")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--qr-cache", default=None, help="folder to keep rendered QR codes in between runs")
+    args = parser.parse_args()
+    if args.roster:
+        make_cards_from_roster(args.roster, args.template, args.out, args.workers, qr_cache_dir=args.qr_cache)
+    else:
+        make_card_qr_text(args.template)